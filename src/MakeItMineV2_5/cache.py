@@ -0,0 +1,263 @@
+import io
+import os
+import json
+import time
+import shutil
+import hashlib
+
+
+def digest(paths:list,prune:tuple=("__pycache__",".git",".mim")) -> str:
+  """ sha256 over the relative path and content of every file in paths, a directory is walked in sorted order. """
+  h = hashlib.sha256()
+  for top in paths:
+    files = [top] if not os.path.isdir(top) else []
+    for root,dirs,names in os.walk(top):
+      dirs[:] = sorted(d for d in dirs if d not in prune)
+      files += [os.path.join(root,n) for n in sorted(names)]
+    for path in files:
+      if not os.path.exists(path): continue
+      h.update(path.replace(os.sep,"/").encode()+b"\0")
+      with open(path,"rb") as f:
+        for chunk in iter(lambda: f.read(1<<20),b""):
+          h.update(chunk)
+      h.update(b"\0")
+  return h.hexdigest()
+
+
+def place(src:str,dst:str) -> None:
+  """ Hard link src to dst replacing dst, copies when a link is not possible e.g. across file systems. """
+  tmp = f"{dst}.{os.getpid()}"
+  try:
+    os.link(src,tmp)
+  except OSError:
+    shutil.copy2(src,tmp)
+  os.replace(tmp,dst)
+
+
+class BuildCache():
+  """ Content addressed cache of build artifacts, an entry is a directory named by its key.
+      The least recently used entries are evicted once the cache is over its size cap.
+  """
+
+  def __init__(self,root:str,cap:int):
+    self.root = root
+    self.cap = cap # bytes
+    os.makedirs(root,exist_ok=True)
+
+  def _entry(self,key:str) -> str:
+    return os.path.join(self.root,key)
+
+  def get(self,key:str,dest:str) -> list:
+    """ Place the entry's files into dest, returns their names or None on a miss. """
+    entry = self._entry(key)
+    try:
+      with open(os.path.join(entry,"meta.json"),"r") as f:
+        meta = json.load(f)
+    except (FileNotFoundError,ValueError):
+      return None
+    os.makedirs(dest,exist_ok=True)
+    for name in meta["files"]:
+      place(os.path.join(entry,name),os.path.join(dest,name))
+    os.utime(entry) # Most recently used.
+    return meta["files"]
+
+  def put(self,key:str,files:list,**meta) -> None:
+    """ Store files under key, meta is kept with them e.g. the build duration. """
+    entry = self._entry(key)
+    if os.path.exists(entry): return
+    tmp = f"{entry}.{os.getpid()}.tmp"
+    os.makedirs(tmp,exist_ok=True)
+    for path in files:
+      shutil.copy2(path,os.path.join(tmp,os.path.basename(path)))
+    meta.update({"files":[os.path.basename(p) for p in files],"size":sum(os.path.getsize(p) for p in files),"created":time.time()})
+    with open(os.path.join(tmp,"meta.json"),"w") as f:
+      json.dump(meta,f)
+    try:
+      os.rename(tmp,entry)
+    except OSError: # Another build stored the same key first.
+      shutil.rmtree(tmp,ignore_errors=True)
+    self.evict()
+
+  def meta(self,key:str) -> dict:
+    """ The entry's meta, None when not cached. """
+    try:
+      with open(os.path.join(self._entry(key),"meta.json"),"r") as f:
+        return json.load(f)
+    except (FileNotFoundError,ValueError):
+      return None
+
+  def evict(self) -> None:
+    """ Remove the least recently used entries until the cache is within its cap. """
+    entries = []
+    for e in os.scandir(self.root):
+      if e.name.endswith(".tmp") or not e.is_dir(): continue
+      meta = self.meta(e.name)
+      entries.append((e.stat().st_mtime,meta["size"] if meta else 0,e.path))
+    total = sum(size for _,size,_ in entries)
+    for mtime,size,path in sorted(entries):
+      if total <= self.cap: break
+      shutil.rmtree(path,ignore_errors=True)
+      total -= size
+
+
+class SharedCache():
+  """ Cache shared between machines, keyed like BuildCache.
+      A key holds its files and a meta.json, with the sha256 of each file, that is
+      written last so a reader never sees a partial entry. Files are streamed in
+      chunks and verified against the sha256 after download.
+      A store, e.g. DirCache, adds _open(key,name), a readable binary stream of a file
+      of the entry raising FileNotFoundError when missing, and _write(key,name,f,size)
+      storing size bytes read from the binary stream f.
+  """
+
+  def get(self,key:str,dest:str) -> dict:
+    """ Download the entry's files into dest, returns the meta or None on a miss or a bad checksum. """
+    try:
+      with self._open(key,"meta.json") as f:
+        meta = json.load(f)
+    except (FileNotFoundError,ValueError):
+      return None
+    os.makedirs(dest,exist_ok=True)
+    for name,sha in meta["sha256"].items():
+      path = os.path.join(dest,name)
+      tmp = f"{path}.{os.getpid()}"
+      h = hashlib.sha256()
+      with self._open(key,name) as src, open(tmp,"wb") as dst:
+        for chunk in iter(lambda: src.read(1<<20),b""):
+          h.update(chunk)
+          dst.write(chunk)
+      if h.hexdigest() != sha:
+        os.remove(tmp)
+        print(f"shared cache {key[:12]} {name} failed its checksum, ignoring the entry")
+        return None
+      os.replace(tmp,path)
+    return meta
+
+  def put(self,key:str,files:list,**meta) -> None:
+    """ Upload files under key, meta is kept with them e.g. the build duration. """
+    meta["sha256"] = {}
+    for path in files:
+      name = os.path.basename(path)
+      h = hashlib.sha256()
+      with open(path,"rb") as f:
+        for chunk in iter(lambda: f.read(1<<20),b""):
+          h.update(chunk)
+      meta["sha256"][name] = h.hexdigest()
+      with open(path,"rb") as f:
+        self._write(key,name,f,os.path.getsize(path))
+    meta["files"] = list(meta["sha256"])
+    data = json.dumps(meta).encode()
+    self._write(key,"meta.json",io.BytesIO(data),len(data))
+
+
+class DirCache(SharedCache):
+  """ Shared cache in a directory e.g. a network mount. """
+
+  def __init__(self,root:str):
+    self.root = root
+
+  def _open(self,key:str,name:str):
+    return open(os.path.join(self.root,key,name),"rb")
+
+  def _write(self,key:str,name:str,f,size:int) -> None:
+    d = os.path.join(self.root,key)
+    os.makedirs(d,exist_ok=True)
+    tmp = os.path.join(d,f".{name}.{os.getpid()}")
+    with open(tmp,"wb") as o:
+      shutil.copyfileobj(f,o,1<<20)
+    os.replace(tmp,os.path.join(d,name))
+
+
+class HttpCache(SharedCache):
+  """ Shared cache in an HTTP blob store, GET and PUT of <url>/<key>/<name>. """
+
+  def __init__(self,url:str):
+    self.url = url.rstrip("/")
+
+  def _open(self,key:str,name:str):
+    import urllib.error,urllib.request # Only loaded when the shared cache is over http.
+    try:
+      return urllib.request.urlopen(f"{self.url}/{key}/{name}",timeout=60)
+    except urllib.error.HTTPError as e:
+      if e.code == 404: raise FileNotFoundError(f"{self.url}/{key}/{name}")
+      raise
+
+  def _write(self,key:str,name:str,f,size:int) -> None:
+    import urllib.request
+    request = urllib.request.Request(f"{self.url}/{key}/{name}",data=f,method="PUT",
+                                     headers={"Content-Length":str(size),"Content-Type":"application/octet-stream"})
+    with urllib.request.urlopen(request,timeout=600):
+      pass
+
+
+def shared_cache(spec:str) -> SharedCache:
+  """ The shared cache for an http(s):// URL or a directory, None when spec is empty. """
+  if not spec: return None
+  if spec.startswith("http://") or spec.startswith("https://"): return HttpCache(spec)
+  return DirCache(spec)
+
+
+class VenvCache(BuildCache):
+  """ Template venvs, an entry is a venv built once for its key e.g. the python and a hash of the requirements.
+      A venv is made from a template by hard linking its files, copying them across file systems. The
+      scripts in bin and pyvenv.cfg name the directory the template was built in, so they are copied with
+      that replaced by the venv's directory.
+  """
+
+  def get(self,key:str,dest:str) -> bool:
+    """ Replace the venv dest by a clone of the template, False on a miss. """
+    meta = self.meta(key)
+    if not meta: return False
+    entry = self._entry(key)
+    old,new = meta["path"],os.path.abspath(dest)
+    tmp = f"{new}.{os.getpid()}.tmp"
+    for root,dirs,files in os.walk(entry):
+      rel = os.path.relpath(root,entry)
+      top = os.path.normpath(os.path.join(tmp,rel))
+      os.makedirs(top,exist_ok=True)
+      for name in dirs+files:
+        src,dst = os.path.join(root,name),os.path.join(top,name)
+        if os.path.islink(src):
+          os.symlink(os.readlink(src).replace(old,new),dst)
+        elif name in dirs or (rel == "." and name == "meta.json"):
+          continue
+        elif rel == "bin" or (rel == "." and name == "pyvenv.cfg"):
+          with open(src,"rb") as f:
+            data = f.read()
+          with open(dst,"wb") as f:
+            f.write(data.replace(old.encode(),new.encode()))
+          shutil.copymode(src,dst)
+        else:
+          place(src,dst)
+    if os.path.lexists(dest):
+      trash = f"{new}.{os.getpid()}.old"
+      os.rename(dest,trash)
+      shutil.rmtree(trash,ignore_errors=True)
+    os.rename(tmp,dest)
+    os.utime(entry) # Most recently used.
+    return True
+
+  def put(self,key:str,build,**meta) -> None:
+    """ Build the template with build(path), a function creating the venv at path, meta has how long it took.
+        When build raises nothing is stored, the partial venv is removed and the exception propagates.
+    """
+    entry = self._entry(key)
+    if os.path.exists(entry): return
+    tmp = os.path.abspath(f"{entry}.{os.getpid()}.tmp")
+    try:
+      start = time.time()
+      build(tmp)
+      meta["seconds"] = time.time()-start
+      size = 0
+      for root,dirs,files in os.walk(tmp):
+        size += sum(os.lstat(os.path.join(root,name)).st_size for name in files)
+      meta.update({"path":tmp,"size":size,"created":time.time()})
+      with open(os.path.join(tmp,"meta.json"),"w") as f:
+        json.dump(meta,f)
+      try:
+        os.rename(tmp,entry)
+      except OSError: # Another build stored the same key first.
+        pass
+    finally:
+      shutil.rmtree(tmp,ignore_errors=True)
+    self.evict()
@@ -1,8 +1,11 @@
 import os
 import sys
 import re
+import time
+import shutil
+import threading
 import argparse
-from MakeItMineV2_5.make import Make
+from MakeItMineV2_5.make import Make, StatusColumn
 
 
 class DkMake(Make):
@@ -15,6 +18,7 @@ class DkMake(Make):
     self.dkdc = os.path.join("example","docker-compose.yml")
     self.dkr = os.path.join("example","release.env")
     self.dkdr = os.path.join("example","dkrun_release.env")
+    self.dksecrets = None
 
   def _files(self) -> list:
     """ Perminant files that can be created by this class. """
@@ -27,11 +31,12 @@ class DkMake(Make):
     if os.path.exists(p):
       print(f"{p} exists, wont recreate")
       return
-    name = self.projectName()
+    project = self._project().project
+    name = project.get("name")
     if not name:
       print("No name in pyproject.toml, add name=<name> to [project]")
       return
-    version=self.projectVersion()
+    version = project.get("version")
     if not version:
       print("No version in pyproject.toml, add version=0.0.0 to [project]")
       return
@@ -54,47 +59,100 @@ RUN --mount=type=bind,source=./dist,target=/tmp/offline_dist \
     with open(".dockerignore","w") as f:
       f.write("""
 venv/
+.mim/
 .git/
 __pycache/
 download/
 """)
 
+  def _dkclient(self) -> "DockerClient":
+    """ The Docker Engine API client, its connections are kept open for the whole run. """
+    from MakeItMineV2_5.dockerapi import DockerClient # http.client is only loaded by the docker commands.
+    return self._once("dkclient",DockerClient,None,self)
+
+  def _dkapi(self,method:str,*args,**kwargs):
+    """ util: Call a DockerClient method, failing like a failed docker command. """
+    from MakeItMineV2_5.dockerapi import DockerError
+    try:
+      return getattr(self._dkclient(),method)(*args,**kwargs)
+    except DockerError as e:
+      self._fail(str(e))
+    except OSError as e:
+      self._fail(f"docker engine {self._dkclient().path}: {e}")
+
   def dkcheck(self,show=True) -> None:
-    """ Check if docker is installed """
-    if not self._cmd(["which","docker"],show=show):
-      print("docker is not installed. apt update; apt-get install docker.io; sudo usermod -aG docker ${USER}")
-      sys.exit(1)
-    if "docker" not in self._cmdstr(["groups"],show=show):
-      print("user is not in the docker group. sudo usermod -aG docker ${USER}; login again!!")
-      sys.exit(1)
-
-  def dkbuild(self,secret:str) -> None:
-    """ Build container using docker/Dockerfile. Optional secret is semicolon separated of id-<id>,src=<path> """
-    touchfile=os.path.join("docker","dkbuild")
-    if not self._rebuild_target(touchfile,[self.dkf]): return
+    """ Check if docker is installed and the engine answers """
+    if not shutil.which("docker"):
+      self._fail("docker is not installed. apt update; apt-get install docker.io; sudo usermod -aG docker ${USER}")
+    from MakeItMineV2_5.dockerapi import DockerError
+    client = self._dkclient()
+    if show: print(f"GET unix://{client.path}/_ping")
+    try:
+      client.ping()
+    except PermissionError:
+      self._fail("user is not in the docker group. sudo usermod -aG docker ${USER}; login again!!")
+    except (FileNotFoundError,ConnectionRefusedError):
+      self._fail(f"the docker engine is not running, nothing answers on {client.path}")
+    except (DockerError,OSError) as e:
+      self._fail(f"docker engine {client.path}: {e}")
+
+  def _targets(self) -> list:
+    """ Build targets (Target) declared by this class, each mixin appends its own. """
+    from MakeItMineV2_5.target import Target
+    dist = ["pybuild"] if hasattr(self,"pybuild") else []
+    return super()._targets()+[
+      Target("create_Dockerfile",self.create_Dockerfile,outputs=[self.dkf]),
+      Target("dkbuild",self._dkbuild,inputs=[self.dkf,"dist"],outputs=[os.path.join("docker","dkbuild")],
+             deps=["create_Dockerfile"]+dist)]
+
+  def _dkbuild(self) -> None:
+    """ Build the container image, secrets are from dkbuild. """
     self.dkcheck()
-    name = self.projectname()
-    version = self.projectversion()
-    if secret:
+    name = self.name()
+    version = self.version()
+    cmd = ["docker","build"]
+    if self.dksecrets:
       with open(self.dkf,"r") as f:
         for line in f:
-          m = re.search('-mount=type=secret,id=(.*),target='.line)
+          m = re.search('-mount=type=secret,id=([^,]*),',line)
           if m:
             id = m.group(1)
-            if f'id{id}," not in secret':
-              print(f"secret {id} is required by {self.dkf}")
-              sys.exit(1)
-      cmd = ["docker","build"]
-      for s in secret.split(";"):
+            if f"id={id}," not in self.dksecrets:
+              self._fail(f"secret {id} is required by {self.dkf}")
+      for s in self.dksecrets.split(";"):
         cmd.append("--secret")
         cmd.append(s)
-      cmd += ["--no-cache","-t",f"{name}:{version}","-f",self.dkf,"."]
-      self._cmd(cmd,show=True)
+    cmd += ["--no-cache","-t",f"{name}:{version}","-f",self.dkf,"."]
+    if self._sharedcache():
+      self._dkbuildshared(cmd,name,version)
     else:
-      self._cmd(["docker","build","--no-cache","-t",f"{name}:{version}","-f",self.dkf,"."],show=True)
+      self._cmd(cmd,show=True) # Without a shared cache the image is only built, not saved.
     self._touch(os.path.join("docker","dkbuild"))
 
-  def _run_release_env(self) -> None:
+  def _dkbuildshared(self,cmd:list,name:str,version:str) -> None:
+    """ Load the image from the shared cache, else build it with cmd and push it there. """
+    import hashlib
+    from MakeItMineV2_5.cache import digest
+    key = hashlib.sha256(f"{digest([self.dkf,'dist'])} {name}:{version} {self.dksecrets}".encode()).hexdigest()
+    tar = self._statepath(f"{name}-{version}.tar")
+    meta = self._sharedget("dkbuild",key,os.path.dirname(tar))
+    if meta:
+      print(f"docker load {tar}")
+      self._dkapi("load",tar)
+    else:
+      start = time.time()
+      self._cmd(cmd,show=True)
+      print(f"docker save {name}:{version}")
+      self._dkapi("save",f"{name}:{version}",tar)
+      self._sharedput("dkbuild",key,[tar],seconds=time.time()-start)
+    if os.path.exists(tar): os.remove(tar)
+
+  def dkbuild(self,secrets:str=None) -> None:
+    """ Build container using docker/Dockerfile after pybuild, when they changed. Optional secrets is semicolon separated of id=<id>,src=<path> """
+    self.dksecrets = secrets
+    self._build("dkbuild")
+
+  def _dkrun_release_env(self) -> None:
     with open(self.dkr,"r") as r, open(self.dkdr,"w") as w:
       for line in r:
         if "USERID" in line:
@@ -122,39 +180,93 @@ download/
       print(f"Failed to find container_name for {service} in {self.dkdc}")
       return
     self._dkrun_release_env()
-    try:
-      self._cmd(["docker","stop",container_name],show=True)
-      self._cmd(["docker","rm",container_name],show=True)
-    except:
-      pass
+    self._dkremove(container_name)
     self._cmdInteractive(["docker","compose","-f",self.dkdc,"--env-file",self.dkr,
                            "run","orphans","--name",container_name,"-it",service,"/bin/bash"],show=True)
-    self._cmd(["docker","stop",container_name],show=True)
-    self._cmd(["docker","rm",container_name],show=True)
-
-  def dkpull(self) -> None:
-    """ Put into the local branch any changes on the remote branch """ 
-    p = os.path.join("example","docker-compose.yml")
-    if not os.path.exists(p):
-      print(f"{p} does not exist")
-      return
-    p2 = os.path.join("example","release.env")
-    with open(p2,"r") as f:
+    self._dkremove(container_name)
+
+  def _dkremove(self,container:str) -> None:
+    """ Stop and remove a container, if there is one. """
+    print(f"docker stop {container}; docker rm {container}")
+    if self._dkapi("stop",container): self._dkapi("remove",container)
+
+  def _dkreleaseimages(self) -> list:
+    """ (name,image,tag) of each PULL_<name>=<image> in example/release.env, tag is the value of <name>=<tag>. """
+    values = {}
+    with open(self.dkr,"r") as f:
       for line in f:
-        m = re.search('^PULL_(.*)=(.*)',line)
-        if m:
-          name = m.group(1)
-          image = m.group(2)
-          m = re.search(f'^{name}=(.*)',line)
-          if not m:
-            print(f'{p2} missing {name}=<image>')
-            return
-          tag = m.group(1)
-          if self._cmd(["docker","images","-q",tag],show=True):
-            print(f"Image {tag} already present, wont attemp to repull the remote image")
+        m = re.match(r'^\s*([A-Za-z0-9_]+)\s*=\s*(.*?)\s*$',line)
+        if m: values[m.group(1)] = m.group(2).strip("\"'")
+    images = []
+    for key,image in values.items():
+      if not key.startswith("PULL_"): continue
+      name = key[len("PULL_"):]
+      if name not in values: self._fail(f"{self.dkr} missing {name}=<image>")
+      images.append((name,image,values[name]))
+    return images
+
+  def dkpull(self,workers:int=None) -> None:
+    """ Pull the PULL_<name>=<image> images of example/release.env not yet tagged <name>=<tag>, concurrently, then tag them. """
+    if not os.path.exists(self.dkdc):
+      print(f"{self.dkdc} does not exist")
+      return
+    if not os.path.exists(self.dkr):
+      print(f"{self.dkr} does not exist")
+      return
+    from MakeItMineV2_5.dockerapi import _normal
+    images = self._dkreleaseimages()
+    present = {_normal(ref) for image in self._dkapi("images") or [] for ref in (image.get("RepoTags") or [])+(image.get("RepoDigests") or [])}
+    missing = []
+    for name,image,tag in images:
+      if _normal(tag) in present:
+        print(f"Image {tag} already present, wont attempt to repull the remote image")
+      else:
+        missing.append((name,image,tag))
+    pulls = list(dict.fromkeys(image for _,image,_ in missing)) # An image pulled once for several tags.
+    if not pulls: return
+    import concurrent.futures
+    lock = threading.Lock()
+    layers = {} # [(image,layer)]=[downloaded,size] bytes, from the engine's progress events
+    pulled = {} # [image]=(seconds,bytes)
+    tty = sys.stdout.isatty()
+    def line() -> None:
+      done,size = sum(d for d,_ in layers.values()),sum(t for _,t in layers.values())
+      print(f"\r\033[Kpulled {len(pulled)}/{len(pulls)} images {done/1e6:.1f}/{size/1e6:.1f}MB",end="",flush=True)
+    def pull(image:str) -> None:
+      def progress(event:dict) -> None:
+        detail,key = event.get("progressDetail") or {},(image,event.get("id"))
+        with lock:
+          if event.get("status") == "Downloading" and detail.get("total"):
+            layers[key] = [detail.get("current",0),detail["total"]]
+          elif event.get("status") == "Download complete" and key in layers:
+            layers[key][0] = layers[key][1]
           else:
-            self._cmd(["docker","pull",image],show=True)
-            self._cmd(["tag",image,tag],show=True)
+            return
+          if tty: line()
+      start = time.time()
+      self._dkclient().pull(image,progress)
+      with lock:
+        pulled[image] = (time.time()-start,sum(t for (i,_),(_,t) in layers.items() if i == image))
+        if tty: print("\r\033[K",end="")
+        print(f"docker pull {image} {pulled[image][0]:.1f}s {pulled[image][1]/1e6:.1f}MB",flush=True)
+        if tty: line()
+    start = time.time()
+    with concurrent.futures.ThreadPoolExecutor(max_workers=self._workers(workers)) as pool:
+      futures = {image:pool.submit(pull,image) for image in pulls}
+      errors = {image:f.exception() for image,f in futures.items() if f.exception()}
+    if tty: print("\r\033[K",end="")
+    for name,image,tag in missing:
+      if image in pulled: self._dkapi("tag",image,tag)
+    from texttable import Texttable
+    table = Texttable(max_width=shutil.get_terminal_size().columns)
+    table.set_cols_align(["l","l","l","r","r"])
+    table.add_rows([["name","image","tag","time","pulled"]]+
+                   [[name,image,tag,f"{pulled[image][0]:.1f}s",f"{pulled[image][1]/1e6:.1f}MB"] if image in pulled else
+                    [name,image,tag,"failed",""] for name,image,tag in missing])
+    print(table.draw())
+    print(f"{len(pulled)} images, {sum(b for _,b in pulled.values())/1e6:.1f}MB in {time.time()-start:.1f}s")
+    if errors:
+      self._fail(os.linesep.join(f"docker pull {image}: {e}" for image,e in errors.items()))
 
   def dkup(self) -> None:
     """ Run the services in example/docker-compose.yml """
@@ -172,40 +284,61 @@ download/
       return
     self._cmd(["docker","compose","-f",self.dkdc,"--env-file",self.dkdr,
                 "down"],show=True)
-    self._cmd(["docker","network","prune","-f"],show=True)
+    print("docker network prune")
+    for network in self._dkapi("prune_networks"):
+      print(f"  removed network {network}")
 
   def dkimages(self,show:bool=False) -> str:
     """ Detect prod or dev images. """
     name = self.name()
     version = self.version()
-    prod = self._cmd(["docker","images","-q",f"{name}_editable:{version}"],show=show)
-    dev = self._cmd(["docker","images","-q",f"{name}:{version}"],show=show)
+    if show: print("GET /images/json")
+    tags = {tag for image in self._dkapi("images") or [] for tag in image.get("RepoTags") or []}
+    prod = f"{name}_editable:{version}" in tags
+    dev = f"{name}:{version}" in tags
     return ("yes/prod" if prod else "no/prod") + " " + ("yes/dev" if dev else "no/dev")
 
-  def _status_align(self) -> list:
-    """ Gather table alignment as "l" "r" "c" """
-    return super()._status_align()+["c"]
-
-  def _statusTitles(self) -> list:
-    """ Titles for status """
-    return super()._statusTitles()+["dkimages"]
-
-  def _status(self) -> list:
-    """ Gather project status """
-    self.dkcheck(show=False)
-    return super()._status()+[self.dkimages(show=False)]
-
-  def _upversion(self,version:str,oldversion:str) -> str:
-    """ Update files with the build version. """
-    name=self.name()
-    if os.path.exists(self.dkr):
-      self._sed(self.dkr,f'IMAGE\s*=\s*{name}:.*',f'IMAGE={name}:{version}')
-      self._sed(self.dkr,f'RELEASE\s*=\s*{name}.*',f'RELEASE={name}:{version}')
-    if os.path.exists(self.dkf):
-      self._sed(self.dkf,f'{name}:[0-9.]*',f'{name}:{version}')
-      self._sed(self.dkf,f'{name}==[0-9.]*',f'{name}=={version}')
-    if os.path.exists(self.dkf):
-      self._sed(self.dkf,f'{name}==[0-9.]*',f'{name}=={version}')
+  def dkevents(self,since:str=None) -> None:
+    """ Print the engine's image and container events of this project as they happen, optional since is e.g. 10m, Ctrl-C stops. """
+    from MakeItMineV2_5.dockerapi import DockerError
+    name = self.name()
+    start = None
+    if since:
+      m = re.fullmatch(r'([0-9]+)([smhd]?)',since)
+      if not m: self._fail(f"since {since} is not <number>[s|m|h|d]")
+      start = int(time.time())-int(m.group(1))*{"":1,"s":1,"m":60,"h":3600,"d":86400}[m.group(2)]
+    try:
+      for event in self._dkclient().events({"type":["image","container"]},since=start):
+        attributes = event.get("Actor",{}).get("Attributes",{})
+        what = attributes.get("name") or event.get("id","")
+        if name not in what and name not in attributes.get("image",""): continue
+        when = time.strftime("%H:%M:%S",time.localtime(event.get("time",0)))
+        print(f"{when} {event.get('Type')} {event.get('Action')} {what}",flush=True)
+    except KeyboardInterrupt:
+      pass
+    except (DockerError,OSError) as e:
+      self._fail(f"docker engine {self._dkclient().path}: {e}")
+
+  def _statuscolumns(self) -> list:
+    """ Status columns (StatusColumn) in table order, each mixin appends its own. """
+    def dkimages():
+      self._once("dkcheck",self.dkcheck,show=False)
+      return self.dkimages(show=False)
+    return super()._statuscolumns()+[StatusColumn("dkimages","c",dkimages,[self.bv,self.dkf])]
+
+  def _watchpaths(self) -> list:
+    """ Files and directories watch follows, each mixin appends its own. """
+    return super()._watchpaths()+[os.path.dirname(self.dkf)]
+
+  def _upversion(self,version:str,oldversion:str,rewriter) -> None:
+    """ Add the edits of the files with the build version to rewriter. """
+    super()._upversion(version,oldversion,rewriter)
+    name = self.name()
+    n = re.escape(name)
+    rewriter.add(self.dkr,rf'IMAGE\s*=\s*{n}:.*',f'IMAGE={name}:{version}')
+    rewriter.add(self.dkr,rf'RELEASE\s*=\s*{n}.*',f'RELEASE={name}:{version}')
+    rewriter.add(self.dkf,rf'{n}:[0-9.]*',f'{name}:{version}')
+    rewriter.add(self.dkf,rf'{n}==[0-9.]*',f'{name}=={version}')
 
   @classmethod
   def _main(cls,ap:argparse.ArgumentParser):
@@ -215,6 +348,9 @@ download/
     cls.command_parameters["dkrun"] = ["service"]
     ap.add_argument('-S', '--secrets', help="zero, one or more secrets for docker dkbuild")
     cls.command_parameters_optional["dkbuild"] = ["secrets"]
+    ap.add_argument('--since', help="Events since e.g. 10m, 2h or 1d for docker dkevents")
+    cls.command_parameters_optional["dkevents"] = ["since"]
+    cls.command_parameters_optional["dkpull"] = ["workers"]
 
 
 if __name__ == "__main__":
@@ -0,0 +1,245 @@
+import os
+import json
+import base64
+import socket
+import threading
+import subprocess
+import http.client
+import urllib.parse
+
+
+class DockerError(Exception):
+  """ The Docker Engine answered with an error, status is the HTTP status e.g. 404 for no such image. """
+
+  def __init__(self,status:int,message:str):
+    super().__init__(f"docker {status}: {message}")
+    self.status = status
+
+
+def _registry(reference:str) -> str:
+  """ Registry host of an image reference, docker.io when it names none e.g. python:3.11. """
+  first,_,rest = reference.partition("/")
+  return first if rest and ("." in first or ":" in first or first == "localhost") else "docker.io"
+
+
+def _credentials(registry:str,config:str=None) -> dict:
+  """ username and password (or identitytoken) for registry as docker login stored them in config
+      ($DOCKER_CONFIG/config.json, else ~/.docker/config.json), through its credential helper when it has one.
+      None when there are none.
+  """
+  config = config or os.path.join(os.environ.get("DOCKER_CONFIG") or os.path.join(os.path.expanduser("~"),".docker"),"config.json")
+  try:
+    with open(config,"r") as f:
+      conf = json.load(f)
+  except (FileNotFoundError,ValueError):
+    return None
+  server = "https://index.docker.io/v1/" if registry == "docker.io" else registry
+  helper = conf.get("credHelpers",{}).get(registry) or conf.get("credsStore")
+  if helper:
+    try:
+      out = subprocess.run([f"docker-credential-{helper}","get"],input=server,capture_output=True,text=True,timeout=30)
+      if out.returncode == 0:
+        c = json.loads(out.stdout)
+        if c.get("Username") == "<token>": return {"identitytoken":c.get("Secret"),"serveraddress":server}
+        return {"username":c.get("Username"),"password":c.get("Secret"),"serveraddress":server}
+    except (OSError,ValueError,subprocess.TimeoutExpired):
+      pass
+  for key,auth in conf.get("auths",{}).items():
+    host = urllib.parse.urlparse(key).netloc if "://" in key else key.split("/")[0]
+    if host != registry and not (registry == "docker.io" and host in ["index.docker.io","registry-1.docker.io"]): continue
+    if auth.get("identitytoken"): return {"identitytoken":auth["identitytoken"],"serveraddress":server}
+    try:
+      username,_,password = base64.b64decode(auth.get("auth","")).decode().partition(":")
+    except ValueError: # Not base64.
+      continue
+    if username: return {"username":username,"password":password,"serveraddress":server}
+  return None
+
+
+def _split(reference:str) -> tuple:
+  """ (name,tag) of an image reference, a registry port is not a tag and a digest (name@sha256:...) has no tag. """
+  if "@" in reference: return reference,None
+  name,_,tag = reference.rpartition(":")
+  if name and "/" not in tag: return name,tag
+  return reference,"latest"
+
+
+def _normal(reference:str) -> str:
+  """ reference as the engine lists it in RepoTags: with its tag, default latest, and Docker Hub names short,
+      e.g. docker.io/library/redis is redis:latest.
+  """
+  name,tag = _split(reference)
+  for prefix in ["docker.io/","index.docker.io/"]:
+    if name.startswith(prefix): name = name[len(prefix):]
+  if name.startswith("library/") and name.count("/") == 1: name = name[8:]
+  return name if tag is None else f"{name}:{tag}"
+
+
+class _UnixConnection(http.client.HTTPConnection):
+  """ HTTP/1.1 over a unix socket, kept open between requests. """
+
+  def __init__(self,path:str,timeout:float):
+    super().__init__("localhost",timeout=timeout)
+    self.path = path
+
+  def connect(self):
+    self.sock = socket.socket(socket.AF_UNIX,socket.SOCK_STREAM)
+    self.sock.settimeout(self.timeout)
+    self.sock.connect(self.path)
+
+
+class DockerClient():
+  """ Client of the Docker Engine API on its unix socket, $DOCKER_HOST when it is unix://, else /var/run/docker.sock.
+      Each thread keeps its own connection open, so the concurrent status columns and pulls do not wait on
+      each other and do not reconnect per request. make, when given, gets the requests in its trace.
+      timeout is for the calls answered at once, the streamed ones (pull, save, load, events) have none.
+  """
+
+  def __init__(self,path:str=None,make=None,timeout:float=60):
+    host = os.environ.get("DOCKER_HOST","")
+    self.path = path or (host[7:] if host.startswith("unix://") else "/var/run/docker.sock")
+    self.make = make
+    self.timeout = timeout
+    self._local = threading.local()
+
+  def _connection(self) -> _UnixConnection:
+    if getattr(self._local,"connection",None) is None:
+      self._local.connection = _UnixConnection(self.path,self.timeout)
+    return self._local.connection
+
+  def _request(self,method:str,path:str,params:dict=None,body=None,headers:dict=None,stream:bool=False):
+    """ The response of a request, its body not read yet. DockerError on an error status.
+        stream is for a body read as it comes e.g. a pull, which waits without a timeout.
+    """
+    if params: path += "?"+urllib.parse.urlencode({k:v for k,v in params.items() if v is not None})
+    tracer = self.make.tracer if self.make else None
+    start = tracer.now() if tracer else None
+    timeout = None if stream else self.timeout
+    for attempt in [1,2]:
+      connection = self._connection()
+      connection.timeout = timeout
+      if connection.sock: connection.sock.settimeout(timeout)
+      try:
+        connection.request(method,path,body=body,headers=headers or {})
+        response = connection.getresponse()
+        break
+      except (http.client.RemoteDisconnected,BrokenPipeError,ConnectionResetError):
+        connection.close() # The engine closed the idle connection, reconnect once.
+        self._local.connection = None
+        if attempt == 2 or hasattr(body,"read"): raise
+      except OSError: # e.g. a timeout, the connection is mid request and can not be used again.
+        connection.close()
+        self._local.connection = None
+        raise
+    if tracer: tracer.record(["docker-api",method,path.split("?")[0]],start,response.status,None,None,self.make._tracecaller())
+    if response.status >= 400:
+      data = response.read()
+      try:
+        message = json.loads(data).get("message",data.decode(errors="replace"))
+      except ValueError:
+        message = data.decode(errors="replace")
+      raise DockerError(response.status,message)
+    return response
+
+  def _json(self,method:str,path:str,params:dict=None,body=None):
+    """ The decoded JSON body, None when the body is empty. """
+    headers = None
+    if body is not None and not isinstance(body,(bytes,str)) and not hasattr(body,"read"):
+      body = json.dumps(body)
+      headers = {"Content-Type":"application/json"}
+    data = self._request(method,path,params,body,headers).read()
+    return json.loads(data) if data.strip() else None
+
+  def _lines(self,response):
+    """ JSON objects of a streamed response, one per line, the connection is usable again once they are read. """
+    for line in response:
+      if line.strip(): yield json.loads(line)
+
+  def ping(self) -> bool:
+    """ Is the engine answering, FileNotFoundError when it is not running and PermissionError when not allowed. """
+    return self._request("GET","/_ping").read() == b"OK"
+
+  def images(self,reference:str=None) -> list:
+    """ The images, those matching reference (e.g. name:tag or name) when given. """
+    params = {"filters":json.dumps({"reference":[reference]})} if reference else None
+    return self._json("GET","/images/json",params)
+
+  def inspect(self,name:str) -> dict:
+    """ An image's details, None when there is no such image. """
+    try:
+      return self._json("GET",f"/images/{urllib.parse.quote(name,safe='/:')}/json")
+    except DockerError as e:
+      if e.status == 404: return None
+      raise
+
+  def tag(self,image:str,reference:str) -> None:
+    """ Tag image as reference, name:tag. """
+    repo,tag = _split(reference)
+    self._request("POST",f"/images/{urllib.parse.quote(image,safe='/:')}/tag",{"repo":repo,"tag":tag}).read()
+
+  def pull(self,reference:str,progress=None) -> dict:
+    """ Pull an image, progress(event) is called for each progress event e.g. {"id":layer,"status":"Downloading",
+        "progressDetail":{"current":n,"total":n}}. Returns the last event, DockerError when the pull failed.
+        The registry credentials are those of docker login, see _credentials.
+    """
+    name,tag = _split(reference)
+    auth = _credentials(_registry(reference))
+    headers = {"X-Registry-Auth":base64.urlsafe_b64encode(json.dumps(auth).encode()).decode()} if auth else None
+    last = {}
+    for event in self._lines(self._request("POST","/images/create",{"fromImage":name,"tag":tag},headers=headers,stream=True)):
+      if "error" in event: raise DockerError(500,event["error"])
+      if progress: progress(event)
+      last = event
+    return last
+
+  def save(self,name:str,path:str) -> None:
+    """ Write the image as a tar to path. """
+    response = self._request("GET","/images/get",{"names":name},stream=True)
+    tmp = f"{path}.{os.getpid()}"
+    with open(tmp,"wb") as f:
+      for chunk in iter(lambda: response.read(1<<20),b""):
+        f.write(chunk)
+    os.replace(tmp,path)
+
+  def load(self,path:str) -> None:
+    """ Load the images of a tar written by save. """
+    with open(path,"rb") as f:
+      response = self._request("POST","/images/load",{"quiet":"1"},f,
+                               {"Content-Type":"application/x-tar","Content-Length":str(os.path.getsize(path))},stream=True)
+      for event in self._lines(response):
+        if "error" in event: raise DockerError(500,event["error"])
+
+  def stop(self,container:str) -> bool:
+    """ Stop a container, False when there is no such container. """
+    try:
+      self._request("POST",f"/containers/{urllib.parse.quote(container,safe='/:')}/stop").read()
+      return True
+    except DockerError as e:
+      if e.status == 404: return False
+      if e.status == 304: return True # Already stopped.
+      raise
+
+  def remove(self,container:str) -> bool:
+    """ Remove a container, False when there is no such container. """
+    try:
+      self._request("DELETE",f"/containers/{urllib.parse.quote(container,safe='/:')}").read()
+      return True
+    except DockerError as e:
+      if e.status == 404: return False
+      raise
+
+  def prune_networks(self) -> list:
+    """ Remove the unused networks, returns their names. """
+    return (self._json("POST","/networks/prune") or {}).get("NetworksDeleted") or []
+
+  def events(self,filters:dict=None,since:float=None,until:float=None):
+    """ Yield the engine's events e.g. {"Type":"image","Action":"pull","Actor":{...}}, until the time until when given. """
+    params = {"filters":json.dumps(filters) if filters else None,"since":since,"until":until}
+    connection = _UnixConnection(self.path,None) # Its own connection, the stream can stay open indefinitely.
+    connection.request("GET","/events?"+urllib.parse.urlencode({k:v for k,v in params.items() if v is not None}))
+    response = connection.getresponse()
+    if response.status >= 400: raise DockerError(response.status,response.read().decode(errors="replace"))
+    try:
+      yield from self._lines(response)
+    finally:
+      connection.close()
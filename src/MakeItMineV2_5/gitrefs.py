@@ -0,0 +1,234 @@
+import os
+import re
+
+
+class GitRefs():
+  """ Reads HEAD, refs and config straight from the .git directory, no git process is started.
+      Handles loose and packed refs, a .git file (gitdir: ...) and worktrees (commondir).
+      Anything unusual, a GIT_* override in the environment, the reftable ref storage or
+      include directives in config, falls back to the git command line. Config is read like git does,
+      /etc/gitconfig, the global files in XDG_CONFIG_HOME and HOME, the repository and the worktree.
+  """
+
+  def __init__(self,make):
+    self.make = make
+    self.gitdir,self.commondir = self._find(make.cwd)
+    self._cache = {} # [path]=((mtime_ns,size),parsed)
+    self._merged = None # (parsed layers,their merged config)
+    self.cli = (self.gitdir is None
+                or [v for v in ["GIT_DIR","GIT_COMMON_DIR","GIT_CONFIG","GIT_CONFIG_GLOBAL","GIT_CONFIG_SYSTEM","GIT_CONFIG_COUNT"] if v in os.environ] != []
+                or self._config() is None
+                or "extensions.refstorage" in self._config())
+
+  def _find(self,cwd:str) -> tuple:
+    """ (gitdir,commondir) for the work tree containing cwd, (None,None) when not in a work tree. """
+    d = os.path.abspath(cwd)
+    while True:
+      p = os.path.join(d,".git")
+      if os.path.isdir(p):
+        gitdir = p
+        break
+      if os.path.isfile(p):
+        with open(p,"r") as f:
+          line = f.readline().strip()
+        if not line.startswith("gitdir:"): return None,None
+        gitdir = os.path.normpath(os.path.join(d,line[7:].strip()))
+        break
+      parent = os.path.dirname(d)
+      if parent == d: return None,None
+      d = parent
+    commondir = gitdir
+    p = os.path.join(gitdir,"commondir")
+    if os.path.exists(p):
+      with open(p,"r") as f:
+        commondir = os.path.normpath(os.path.join(gitdir,f.read().strip()))
+    return gitdir,commondir
+
+  def _cached(self,path:str,parse):
+    """ Parse a file, reparsing only when its mtime or size changes. None when the file does not exist. """
+    try:
+      st = os.stat(path)
+    except FileNotFoundError:
+      return None
+    sig = (st.st_mtime_ns,st.st_size)
+    hit = self._cache.get(path)
+    if hit and hit[0] == sig: return hit[1]
+    parsed = parse(path)
+    self._cache[path] = (sig,parsed)
+    return parsed
+
+  def _parseconfig(self,path:str) -> dict:
+    """ [section.subsection.key]=list(value), None when the config includes other files. """
+    config = {}
+    section = None
+    with open(path,"r") as f:
+      lines = iter(f.read().splitlines())
+    for line in lines:
+      while line.endswith("\\") and not line.endswith("\\\\"):
+        line = line[:-1]+next(lines,"")
+      line = line.strip()
+      if not line or line[0] in "#;": continue
+      m = re.match(r'^\[\s*([-\w.]+)\s*(?:"((?:[^"\\]|\\.)*)")?\s*\](.*)$',line)
+      if m:
+        name = m.group(1).lower()
+        if name in ["include","includeif"]: return None
+        section = name # Also the deprecated [section.subsection]
+        if m.group(2) is not None:
+          section += "."+re.sub(r'\\(.)',r'\1',m.group(2))
+        line = m.group(3).strip()
+        if not line or line[0] in "#;": continue
+      if section is None: continue
+      key,eq,value = line.partition("=")
+      config.setdefault(f"{section}.{key.strip().lower()}",[]).append(self._value(value) if eq else "true")
+    return config
+
+  def _value(self,raw:str) -> str:
+    """ Config value without comments and quotes, with escapes resolved. """
+    value = []
+    quoted = False
+    i = 0
+    raw = raw.strip()
+    while i < len(raw):
+      c = raw[i]
+      if c == '"':
+        quoted = not quoted
+      elif c == "\\" and i+1 < len(raw):
+        i += 1
+        value.append({"n":"\n","t":"\t","b":"\b"}.get(raw[i],raw[i]))
+      elif c in "#;" and not quoted:
+        break
+      else:
+        value.append(c)
+      i += 1
+    return "".join(value).strip() if not quoted else "".join(value)
+
+  def _configpaths(self) -> list:
+    """ The system and global config files in the order git reads them, before the repository config. """
+    paths = []
+    if os.environ.get("GIT_CONFIG_NOSYSTEM","").lower() in ("","0","false","no","off"):
+      paths.append("/etc/gitconfig")
+    home = os.path.expanduser("~")
+    paths.append(os.path.join(os.environ.get("XDG_CONFIG_HOME") or os.path.join(home,".config"),"git","config"))
+    paths.append(os.path.join(home,".gitconfig"))
+    return paths
+
+  def _config(self) -> dict:
+    """ The system, global, repository and worktree config merged, a later value wins. None when it cannot be read in process. """
+    repo = os.path.join(self.commondir,"config")
+    layers = []
+    for path in self._configpaths()+[repo]:
+      if path != repo and not os.path.exists(path): continue
+      layer = self._cached(path,self._parseconfig)
+      if layer is None: return None
+      layers.append(layer)
+    worktree = os.path.join(self.gitdir,"config.worktree")
+    if layers[-1].get("extensions.worktreeconfig",["false"])[-1] == "true" and os.path.exists(worktree):
+      layer = self._cached(worktree,self._parseconfig)
+      if layer is None: return None
+      layers.append(layer)
+    if self._merged and len(self._merged[0]) == len(layers) and all(a is b for a,b in zip(self._merged[0],layers)):
+      return self._merged[1]
+    config = {}
+    for layer in layers:
+      config = {k:config.get(k,[])+layer.get(k,[]) for k in set(config)|set(layer)}
+    self._merged = (layers,config)
+    return config
+
+  def _parsepacked(self,path:str) -> dict:
+    """ [refname]=oid from packed-refs, peeled lines (^oid) are skipped. """
+    refs = {}
+    with open(path,"r") as f:
+      for line in f:
+        if line[0] in "#^": continue
+        oid,ref = line.rstrip("\n").split(" ",1)
+        refs[ref] = oid
+    return refs
+
+  def _packed(self) -> dict:
+    """ Packed refs. """
+    return self._cached(os.path.join(self.commondir,"packed-refs"),self._parsepacked) or {}
+
+  def _read(self,ref:str) -> str:
+    """ Contents of a loose ref, HEAD and other pseudo refs live in the gitdir the rest in the commondir. """
+    d = self.gitdir if "/" not in ref else self.commondir
+    try:
+      with open(os.path.join(d,ref),"r") as f:
+        return f.read().strip()
+    except (FileNotFoundError,NotADirectoryError,IsADirectoryError):
+      return None
+
+  def config(self,key:str) -> list:
+    """ All values for section[.subsection].key, an empty list when not set. """
+    section,_,name = key.rpartition(".")
+    first,dot,sub = section.partition(".")
+    key = f"{first.lower()}{dot}{sub}.{name.lower()}"
+    if self.cli:
+      return self.make._cmd(["git","config","--get-all",key],fail=False)
+    return self._config().get(key,[])
+
+  def head(self) -> str:
+    """ The symbolic ref of HEAD e.g. refs/heads/main, or the oid when detached. """
+    if self.cli:
+      a = self.make._cmd(["git","symbolic-ref","-q","HEAD"],fail=False)
+      return a[0] if a else self.resolve("HEAD")
+    head = self._read("HEAD")
+    if head and head.startswith("ref:"): return head[4:].strip()
+    return head
+
+  def branch(self) -> str:
+    """ Local branch, None when detached. """
+    head = self.head()
+    if head and head.startswith("refs/heads/"): return head[11:]
+    return None
+
+  def resolve(self,ref:str) -> str:
+    """ oid of a full ref name following symbolic refs, None when it does not exist. """
+    if self.cli:
+      a = self.make._cmd(["git","rev-parse","-q","--verify",ref],fail=False)
+      return a[0] if a else None
+    for depth in range(5):
+      value = self._read(ref)
+      if value is None:
+        return self._packed().get(ref)
+      if not value.startswith("ref:"):
+        return value
+      ref = value[4:].strip()
+    return None
+
+  def refs(self,prefixes:tuple=("refs/heads/","refs/remotes/")) -> dict:
+    """ [refname]=oid for the refs under prefixes, loose refs override packed ones. """
+    if self.cli:
+      refs = {}
+      for line in self.make._cmd(["git","for-each-ref","--format=%(objectname) %(refname)"]+[p.rstrip("/") for p in prefixes]):
+        oid,ref = line.split(" ",1)
+        refs[ref] = oid
+      return refs
+    refs = {r:o for r,o in self._packed().items() if [p for p in prefixes if r.startswith(p)]}
+    for prefix in prefixes:
+      top = os.path.join(self.commondir,prefix)
+      for root,dirs,files in os.walk(top):
+        for file in files:
+          ref = os.path.relpath(os.path.join(root,file),self.commondir).replace(os.sep,"/")
+          oid = self.resolve(ref)
+          if oid and not ref.endswith("/HEAD"): refs[ref] = oid
+    return refs
+
+  def fetched(self) -> float:
+    """ When the remote refs were last fetched, the mtime of FETCH_HEAD, None when never fetched. """
+    if self.cli:
+      path = self.make._cmdstr(["git","rev-parse","--git-path","FETCH_HEAD"],fail=False)
+    else:
+      path = os.path.join(self.gitdir,"FETCH_HEAD") # Per work tree like HEAD.
+    try:
+      return os.path.getmtime(path) if path else None
+    except (FileNotFoundError,NotADirectoryError):
+      return None
+
+  def upstream(self,branch:str) -> str:
+    """ Upstream of a local branch as <remote>/<branch>, None when it does not track a remote. """
+    remote = self.config(f"branch.{branch}.remote")
+    merge = self.config(f"branch.{branch}.merge")
+    if not remote or not merge or remote[-1] == ".": return None
+    m = merge[-1]
+    if m.startswith("refs/heads/"): m = m[11:]
+    return f"{remote[-1]}/{m}"
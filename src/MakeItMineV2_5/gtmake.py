@@ -1,7 +1,15 @@
 import argparse
 import os
+import re
+import json
+import shutil
+import threading
 import datetime
-from MakeItMineV2_5.make import Make
+import time
+from MakeItMineV2_5.make import Make, StatusColumn
+from MakeItMineV2_5.gtsnapshot import GitSnapshot
+from MakeItMineV2_5.gitrefs import GitRefs
+from MakeItMineV2_5.projectinfo import loads
 
 
 class GtMake(Make):
@@ -36,6 +44,8 @@ class GtMake(Make):
     super().__init__(**kwargs)
     self.gitignore=".gitignore"
     self.ci = ".gitlab-ci.yml"
+    self._warm.add("gtrefs") # GitRefs rereads files that changed.
+    self._gtdeepening = threading.Lock() # One fetch --deepen at a time for the concurrent status columns.
 
   def _files(self) -> list:
     """ Perminant files that can be created by this class. """
@@ -43,7 +53,7 @@ class GtMake(Make):
 
   def gtignore(self) -> None:
     """ Create or append to .gitignore in current working directory. """
-    l = [".git",".spyproject", "__pycache__/", "*.py[cod]","dist/","venv/"]    
+    l = [".git",".spyproject", "__pycache__/", "*.py[cod]","dist/","venv/",".mim/"]    
     if not os.path.exists(self.gitignore):
       print("creating {self.gitignore}")
       with open(self.gitignore,"w") as f:
@@ -61,9 +71,99 @@ class GtMake(Make):
         print(f"Adding {s} to .gitignore")
         f.write(f"{s}{os.linesep}")
 
+  def _gtsnapshot(self) -> GitSnapshot:
+    """ The git state shared by every gt* query in this invocation. """
+    return self._once("gtsnapshot",GitSnapshot,self)
+
+  def _gtinvalidate(self,remote:bool=False) -> None:
+    """ Forget the snapshot after a mutating command, remote=True only forgets the refs after a fetch. """
+    if remote:
+      for part in ["refs","log","files"]:
+        self._forget(f"gtsnapshot.{part}")
+    else:
+      self._forget("gtsnapshot")
+
+  def _gtage(self,ts:int) -> str:
+    """ Age of a unix time as days, hours and minutes. """
+    d = datetime.timedelta(seconds=datetime.datetime.now().timestamp() - ts)
+    return f"{d.days:>02d}d:{d.seconds//3600:>02d}H:{(d.seconds//60)%60:>02d}M"
+
+  def _gtsize(self,n:int) -> str:
+    """ Bytes as B, K, M or G. """
+    for unit in ["B","K","M"]:
+      if n < 1024: return f"{n}{unit}"
+      n //= 1024
+    return f"{n}G"
+
+  def _gtrefs(self) -> GitRefs:
+    """ In process reader of HEAD, refs and config. """
+    return self._once("gtrefs",GitRefs,self)
+
   def gtlocalbranch(self) -> str:
     """ Name of the local branch """
-    return self._cmd(["git","branch","--show-current"])[0]
+    return self._gtrefs().branch()
+
+  def _gtdetached(self,branch:str) -> bool:
+    """ util: Is HEAD detached (branch is None), says so since there is no local branch to compare or push. """
+    if branch is None: print("detached HEAD, switch to a branch with gtbranch <branch name>")
+    return branch is None
+
+  def _gtoffline(self) -> bool:
+    """ --offline or $MIM_OFFLINE: never fetch, the remote tracking refs are used as they are. """
+    return os.environ.get("MIM_OFFLINE","0") not in ["","0"]
+
+  def _gtfetchage(self) -> float:
+    """ Seconds since the remote refs were last fetched, None when never fetched. """
+    fetched = self._gtrefs().fetched()
+    return None if fetched is None else time.time()-fetched
+
+  def _gtfetch(self,force:bool=False,show:bool=False) -> str:
+    """ Fetch unless offline or, when not forced, the last fetch is younger than $MIM_FETCH_TTL seconds (default 300).
+        With $MIM_FETCH_BACKGROUND=1 a stale fetch runs detached while the refs as they are are used.
+        Returns what was done: offline, fresh, background or fetched.
+    """
+    if self._gtoffline(): return "offline"
+    age = self._gtfetchage()
+    if not force and age is not None and age < int(os.environ.get("MIM_FETCH_TTL","300")): return "fresh"
+    if not force and os.environ.get("MIM_FETCH_BACKGROUND","0") not in ["","0"]:
+      self._cmdbackground(["git","fetch","--quiet"],show=show)
+      return "background"
+    self.gtfetch(show=show)
+    return "fetched"
+
+  def _gtcloneconfig(self,toml:dict=None) -> dict:
+    """ Partial clone filter, shallow depth and sparse-checkout cone directories from [tool.makeitmine.git] of
+        pyproject.toml (toml when given) e.g.
+          [tool.makeitmine.git]
+          filter = "blob:none"
+          depth = 50
+          sparse = ["src","docs"]
+        filter defaults to blob:none, "" is a full clone. depth defaults to the whole history.
+    """
+    if toml is None: toml = self._project().toml
+    git = toml.get("tool",{}).get("makeitmine",{}).get("git",{})
+    return {"filter":git.get("filter","blob:none"),"depth":int(git["depth"]) if git.get("depth") else None,
+            "sparse":list(git.get("sparse",[]))}
+
+  def _gtshallow(self) -> bool:
+    """ Is the history cut at a depth, see gtclone. """
+    refs = self._gtrefs()
+    if refs.cli: return self._cmdstr(["git","rev-parse","--is-shallow-repository"],fail=False) == "true"
+    return os.path.exists(os.path.join(refs.commondir,"shallow"))
+
+  def _gtdeepen(self,left:str,right:str,show:bool=False) -> None:
+    """ In a shallow clone fetch more history, doubling the depth each time, until left and right have a common
+        ancestor so the three dot log and diff see the fork point. Unshallow when that does not find it.
+    """
+    if left == right or self._gtoffline() or not self._gtshallow(): return
+    with self._gtdeepening:
+      depth = self._gtcloneconfig()["depth"] or 50
+      for i in range(8):
+        if [l for l in self._cmd(["git","merge-base",left,right],fail=False) if re.match("^[0-9a-f]{40,64}$",l)]: return
+        if not self._gtshallow(): return
+        self._cmd(["git","fetch","--quiet","--deepen",str(depth)],show=show)
+        depth *= 2
+      self._cmd(["git","fetch","--quiet","--unshallow"],show=show)
 
   def gtbranch(self,branch:str) -> None:
     """ Switch to a branch. Create branch locally if it does not exist. """
@@ -71,75 +171,86 @@ class GtMake(Make):
     if localbranch == branch:
       print(f"already on {branch}")
       return
-    self._cmd(["git","fetch"],show=True)
-    if branch in self._cmd(["git","branch","--list"],show=True):
+    self._gtfetch(show=True)
+    refs = self._gtsnapshot().refs()
+    if f"refs/heads/{branch}" in refs or f"refs/remotes/origin/{branch}" in refs: # switch creates the local branch tracking the remote one.
       self._cmd(["git","switch",branch],show=True)
-      self._cmd(["git","pull",branch],show=True)
+      self._gtinvalidate()
+      if self.gttrackingremotebranch(): self._cmd(["git","pull"],show=True)
       return
     if branch == "main":
       print("Cannot create main branch")
       return
     self._cmd(["git","branch",branch],show=True)
     self._cmd(["git","switch",branch],show=True)
+    self._gtinvalidate()
 
   def gttrackingremotebranch(self) -> bool:
     """ Does localbranch track a remote branch? """
-    localbranch = self.gtlocalbranch()
-    self._cmd(["git","fetch"],show=True)
-    for branch in self._cmd(["git","config","--get",f"branch.{localbranch}.remote"],show=True,fail=False):
-      if "origin" == branch: return True
-    return False
+    upstream = self._gtsnapshot().upstream()
+    return upstream is not None and upstream.startswith("origin/")
 
   def gtpush(self) -> None:
     """ Commit and push to remote branch """
-    if self.gtuncommittedfiles():
+    if self._gtsnapshot().changed():
       self._cmdInteractive(["git","commit","."],show=True)
+      self._gtinvalidate()
+    if self._gtoffline():
+      print("offline, not pushing")
+      return
+    self._gtfetch(force=True,show=True) # The remote ahead check needs the remote as it is now.
     localbranch = self.gtlocalbranch()
-    if not self.gttrackingremotebranch():
-      self._cmd(["git","branch",f"--track=origin/{localbranch}"],show=True)
-    if self.gtremoteaheadfiles():
+    if self._gtdetached(localbranch): return
+    if self._gtsnapshot().log(localbranch,f"origin/{localbranch}"):
       print("Error: remote is ahead of local. Hint: gtrebaseremote")
       return
     # -u setups tracking between the new remote branch and the existing local branch
     self._cmd(["git","push","-u","origin",localbranch],show=True)
+    self._gtinvalidate()
 
   def gtrelease(self) -> None:
     """ TO TEST: release changes on remote branch into origin/main. """
-    if self.gtlocalchanges():
+    if self._gtsnapshot().changed():
       print("Error, commit local changes before merge")
       return
     branch = self.gtlocalbranch()
+    if self._gtdetached(branch): return
     if branch == "main":
       print("Error, on main branch and must be on a developer branch")
       return
     self._cmd(["git","checkout","main"],show=True)
-    self._cmd(["git","fetch"],show=True)
+    self._gtfetch(force=True,show=True)
     self._cmd(["git","pull"],show=True)
     self._cmd(["git","merge","--no-ff",branch],show=True)
     self._cmd(["git","push"],show=True)
+    self._gtinvalidate()
 
   def gtrebasemain(self) ->  None:
     """ TO TEST: rebase local branch with new changes on main. """
     status = self._cmd(["git","status"],show=True)
-    branch = self.gtlocalbranch()
+    snapshot = self._gtsnapshot()
+    branch = snapshot.branch()
     if [x for x in status if "interactive rebase in progress" in x]:
       print("INPROGRESS; rebase already in progress")
       self._cmdInteractive(["git","rebase","--continue"],show=True)
+      self._gtinvalidate()
       return
-    if self.gtuncommittedfiles(show=False):
+    if snapshot.changed():
       print("Error, commit local changes (gtuncommittedfiles) before merge")
       return
-    if self.gtremoteahead(show=False):
+    if self._gtdetached(branch): return
+    if snapshot.log(branch,f"origin/{branch}"):
       print("ERROR gtrebasemain needed due to new changes on remote branch")
       return
     if branch == "main":
       print("ERROR use gtrebasemain when on main")
       return
-    if not self.gtmainfiles():
+    if not snapshot.log(f"origin/{branch}","origin/main"):
       print(f"Nothing to rebase, {branch} is up to date with main")
       return
-    self._cmd(["git","fetch","origin"],show=True)
+    self._gtfetch(force=True,show=True)
     self._cmdInteractive(["git","merge","main"],show=True)
+    self._gtinvalidate()
 
   def gtrebaseremote(self) ->  None:
     """ TO TEST: rebase local branch with new changes on remote branch. """
@@ -147,15 +258,18 @@ class GtMake(Make):
     if [x for x in status if "interactive rebase in progress" in x]:
       print("ERROR gtrebasemain in progress")
       return
-    if self.gtuncommittedfiles(show=False):
+    if self._gtsnapshot().changed():
       print("ERROR gtcommit local changes before merge")
       return
     self._cmdInteractive(["git","pull","origin","main"],show=True)
+    self._gtinvalidate()
 
   def gtadd(self) -> str:
     """ Add gtuntrackedfiles to git. """
-    files = self.gtuntrackedfiles()
-    if files: self._cmd(["git","add"]+files.split(os.linesep),show=True)
+    files = self._gtsnapshot().untracked()
+    if files:
+      self._cmd(["git","add"]+files,show=True)
+      self._gtinvalidate()
 
   def gtcreate(self) -> None:
     """ Create a Git repository from the current working directory.
@@ -168,6 +282,7 @@ class GtMake(Make):
     url=input("Create the remote repo and enter the URL:")
     self.gtignore()
     self._cmdInteractive(["git","init","--initial-branch","main","."],show=True)
+    self._forget("gtrefs")
     self._cmd(["git","add"]+self._files(),show=True)
     self.gtadd()
     self._cmd(["git","remote","set-url","--add","origin",url],show=True)
@@ -175,181 +290,340 @@ class GtMake(Make):
 
   def gtsetremote(self,url:str) -> None:
     """ Setup the remote URL for a newly created local project. """
-    for u in self._cmd(["git","remote","get-url","origin","--all"],show=True):
+    for u in self._gtrefs().config("remote.origin.url"):
       if u != url:
-        print(f"different url in .git/config please edit to delete the url {u}")
-        os._exit(1)
+        self._fail(f"different url in .git/config please edit to delete the url {u}")
       else:
         print(f"{url} already in .git/config wont readd")
         return
     self._cmd(["git","remote","set-url","--add","origin",url],show=True)
 
+  def gtclone(self,url:str,filter:str=None,depth:int=None,sparse:str=None) -> None:
+    """ Clone url into a directory named after it, blobless (--filter=blob:none) by default so file contents are
+        fetched when checked out or diffed. filter, depth and sparse (comma separated cone directories) default to
+        [tool.makeitmine.git] of this project's pyproject.toml, sparse to that of the cloned project first.
+    """
+    config = self._gtcloneconfig()
+    filter = config["filter"] if filter is None else filter
+    depth = config["depth"] if depth is None else depth
+    name = re.sub(r'\.git$','',url.rstrip("/").split("/")[-1].split(":")[-1])
+    if os.path.exists(name):
+      print(f"{name} exists, wont clone")
+      return
+    cmd = ["git","clone","--no-checkout"]
+    if filter: cmd.append(f"--filter={filter}")
+    if depth: cmd += ["--depth",str(depth),"--no-single-branch"] # All the branches for gtbranch.
+    self._cmd(cmd+[url,name],show=True)
+    if sparse is not None:
+      cones = [d for d in sparse.split(",") if d]
+    elif self._cmd(["git","-C",name,"ls-tree","--name-only","HEAD",self.toml],fail=False) == [self.toml]:
+      toml = loads(os.linesep.join(self._cmd(["git","-C",name,"show",f"HEAD:{self.toml}"]))) # The one blob fetched before checkout.
+      cones = self._gtcloneconfig(toml)["sparse"] or config["sparse"]
+    else:
+      cones = config["sparse"]
+    if cones:
+      self._cmd(["git","-C",name,"sparse-checkout","set","--cone"]+cones,show=True)
+    self._cmd(["git","-C",name,"checkout"],show=True)
+
+  def _gtcommits(self,left:str,right:str,newest:bool,show:bool) -> str:
+    """ Status of the commits in right that are not in left, with the uid and age of the newest or oldest commit. """
+    snapshot = self._gtsnapshot()
+    branch = snapshot.branch()
+    if branch is None: return "detached\nHEAD"
+    commits = snapshot.log(left,right,show=show)
+    if not commits: return f"0/files\n{branch}/br"
+    ts,author = commits[0] if newest else commits[-1]
+    cnt = len(snapshot.files(left,right,show=show))
+    return f"{cnt}/files\n{branch}/br\n{author.split('/')[-1]}/uid\n{self._gtage(ts)}/age"
+
+  def _gtfiles(self,left:str,right:str,show:bool,max_lines:int=None) -> None:
+    """ Print the files changed in right since it forked from left, streamed from git. """
+    snapshot = self._gtsnapshot()
+    if left == right or not snapshot.has(left) or not snapshot.has(right): return
+    self._gtdeepen(left,right,show)
+    self._page(self._cmdstream(["git","diff","--name-only",f"{left}...{right}"],show=show),max_lines)
+
+  def _gtdiff(self,refs:list,show:bool,max_lines:int=None,stat:bool=False) -> None:
+    """ Print git diff refs streamed through the pager, only the per file summary when stat. """
+    for r in refs:
+      if "..." in r: self._gtdeepen(*r.split("...",1),show)
+    self._page(self._cmdstream(["git","diff"]+(["--stat"] if stat else [])+refs,show=show),max_lines)
+
   def gtmainahead(self,show=True) -> str:
     """ remote..main """
     branch = self.gtlocalbranch()
     if branch == "main": return "n/a on main"
-    a = self._cmd(["git","log","--date=unix","--pretty=format:%ad %an",f"origin/{branch}..origin/main"],show=show).split("\n")[0].split(" ")
-    if not a[0]: return f"0/files\n{branch}/br"
-    d = datetime.timedelta(seconds=datetime.datetime.now().timestamp() - int(a[0]) if a else 0)
-    dd = d.days
-    hh = d.seconds//3600
-    mm = (d.seconds//60)%60
-    cnt = len(self.gtmainaheadfiles(show=False).split(os.linesep))
-    return f"{cnt}/files\n{branch}/br\n{a[1]}/uid {dd:>02d}:{hh:>02d}:{mm:>02d}/age"
-
-  def gtmainaheadfiles(self,show=True) -> str:
+    return self._gtcommits(f"origin/{branch}","origin/main",True,show)
+
+  def gtmainaheadfiles(self,show=True,max_lines:int=None) -> None:
     """ remote..main """
     branch = self.gtlocalbranch()
-    return self._cmdstr(["git","diff","--name-only",f"origin/{branch}...origin/main"],show=show)
+    if self._gtdetached(branch): return
+    self._gtfiles(f"origin/{branch}","origin/main",show,max_lines)
 
-  def gtmainaheaddiff(self,show=True) -> str:
+  def gtmainaheaddiff(self,show=True,max_lines:int=None,stat:bool=False) -> None:
     """ remote..main """
     branch = self.gtlocalbranch()
-    return self._cmdstr(["git","diff",f"origin/{branch}...origin/main"],show=show)
+    if self._gtdetached(branch): return
+    self._gtdiff([f"origin/{branch}...origin/main"],show,max_lines,stat)
 
   def gtmainbehind(self,show=True) -> str:
     """ main..remote """
     branch = self.gtlocalbranch()
     if branch == "main": return "n/a on main"
-    a = self._cmd(["git","log","--date=unix","--pretty=format:%ad %an",f"origin/main..origin/{branch}"],show=show).split("\n")[-1].split(" ")
-    if not a: return f"0/files\n{branch}/br"
-    d = datetime.timedelta(seconds=datetime.datetime.now().timestamp() - int(a[0]) if a else 0)
-    dd = d.days
-    hh = d.seconds//3600
-    mm = (d.seconds//60)%60
-    remote = a[1].split("/")[-1]
-    cnt = len(self.gtmainbehindfiles(show=False).split(os.linesep))
-    return f'{cnt}/files\n{branch}/br\n{remote}/uid\n{dd:>02d}d:{hh:>02d}H:{mm:>02d}M/age'
-
-  def gtmainbehindfiles(self,show=True) -> str:
+    return self._gtcommits("origin/main",f"origin/{branch}",False,show)
+
+  def gtmainbehindfiles(self,show=True,max_lines:int=None) -> None:
     """ Branch commits not released to main branch. """
     branch=self.gtlocalbranch()
-    return self._cmdstr(["git","diff","--name-only",f"origin/main...origin/{branch}"],show=show)
+    if self._gtdetached(branch): return
+    self._gtfiles("origin/main",f"origin/{branch}",show,max_lines)
 
-  def gtmainbehinddiff(self,show=True) -> str:
+  def gtmainbehinddiff(self,show=True,max_lines:int=None,stat:bool=False) -> None:
     """ Branch commits not released to main branch. """
     branch=self.gtlocalbranch()
-    return self._cmdstr(["git","diff",f"origin/main...origin/{branch}"],show=show)
+    if self._gtdetached(branch): return
+    self._gtdiff([f"origin/main...origin/{branch}"],show,max_lines,stat)
 
   def gtremoteahead(self,show=True) -> str:
     """ local..remote. """
     branch = self.gtlocalbranch()
-    a = self._cmd(["git","log","--date=unix","--pretty=format:%ad %an",f"{branch}..origin/{branch}"],show=show)
-    if not a: return f"0/files\n{branch}/br"
-    a=a[-1].split(" ")
-    d = datetime.timedelta(seconds=datetime.datetime.now().timestamp() - int(a[0]))
-    dd = d.days
-    hh = d.seconds//3600
-    mm = (d.seconds//60)%60
-    remote = a[1].split("/")[-1]
-    cnt = len(self.gtremoteaheeadfiles(show=False).split(os.linesep))
-    return f'{cnt}/files\n{branch}/br\n{remote}/uid\n{dd:>02d}d:{hh:>02d}H:{mm:>02d}M/age'
-
-  def gtremoteaheadfiles(self,show=True) -> str:
+    return self._gtcommits(branch,f"origin/{branch}",False,show)
+
+  def gtremoteaheadfiles(self,show=True,max_lines:int=None) -> None:
     """ local...remote. """
     branch=self.gtlocalbranch()
-    return self._cmdstr(["git","diff","--name-only",f"{branch}...origin/{branch}"],show=show)
+    if self._gtdetached(branch): return
+    self._gtfiles(branch,f"origin/{branch}",show,max_lines)
 
-  def gtremoteaheaddiff(self,show=True) -> str:
+  def gtremoteaheaddiff(self,show=True,max_lines:int=None,stat:bool=False) -> None:
     """ local...remote. """
     branch=self.gtlocalbranch()
-    return self._cmdstr(["git","diff",f"{branch}...origin/{branch}"],show=show)
+    if self._gtdetached(branch): return
+    self._gtdiff([f"{branch}...origin/{branch}"],show,max_lines,stat)
 
   def gtuntracked(self,show:bool=True) -> str:
     """ Untracked local files. """
-    cnt = len(self._cmd(["git","ls-files","--others","--exclude-standard"],show=show))
+    cnt = len(self._gtsnapshot().untracked(show=show))
     return f'{cnt}/files'
 
-  def gtuntrackedfiles(self,show:bool=True) -> str:
-    """ Untracked local files. """
-    return self._cmdstr(["git","ls-files","--others","--exclude-standard"],show=show)
+  def gtuntrackedfiles(self,show:bool=True,max_lines:int=None) -> None:
+    """ Untracked local files, streamed from git. """
+    self._page(self._cmdstream(["git","-c","core.quotePath=false","ls-files","--others","--exclude-standard"],show=show),max_lines)
 
   def gtuncommitted(self,show=True) -> str:
+    """ Uncommitted local changes, deleted files count but have no age or size. """
+    snapshot = self._gtsnapshot()
+    branch = snapshot.branch()
+    w = snapshot.worktree(show=show)
+    if not w["count"]: return "0/files"
+    cell = f"{w['count']}/files\n{branch}/br"
+    if w["deleted"]: cell += f"\n{w['deleted']}/deleted"
+    if w["oldest"] is not None: cell += f"\n{self._gtage(w['oldest'])}/age\n{self._gtsize(w['bytes'])}/size"
+    return cell
+
+  def gtuncommittedfiles(self,show=True,max_lines:int=None) -> None:
+    """ Uncommitted local changes, streamed from git. Before the first commit the staged files. """
+    base = ["HEAD"] if self._gtrefs().resolve("HEAD") else ["--cached"]
+    self._page(self._cmdstream(["git","-c","core.quotePath=false","diff","--name-only"]+base,show=show),max_lines)
+
+  def gtuncommitteddiff(self,show=True,max_lines:int=None,stat:bool=False) -> None:
     """ Uncommitted local changes. """
-    branch = self.gtlocalbranch()
-    l = [os.path.getmtime(file) for file in self.gtuncommittedfiles(show=False).split(os.linesep)]
-    if not l: return "0/files"
-    cnt = len(l)
-    oldest = min(l)
-    d = datetime.timedelta(seconds=datetime.datetime.now().timestamp() - oldest)
-    dd = d.days
-    hh = d.seconds//3600
-    mm = (d.seconds//60)%60
-    return f"{cnt}/files\n{branch}/br\n{dd:>02d}d:{hh:>02d}H:{mm:>02d}M/age"
-
-  def gtuncommittedfiles(self,show=True) -> str:
-    """ Uncommitted local changes. """
-    branch = self.gtlocalbranch()
-    return self._cmdstr(["git","diff","--name-only",f"{branch}"],show=show)
-
-  def gtuncommitteddiff(self,show=True) -> str:
-    """ Uncommitted local changes. """
-    branch = self.gtlocalbranch()
-    return self._cmdstr(["git","diff",f"{branch}"],show=show)
+    self._gtdiff(["HEAD"],show,max_lines,stat)
 
   def gtremotebehind(self,show=True) -> str:
     """ remote..local """
     branch = self.gtlocalbranch()
-    a = self._cmd(["git","log","--date=unix","--pretty=format:%ad %an",f"origin/{branch}..{branch}"],show=show)
-    if not a: return f"0/files\n{branch}/br"
-    a = a[0].split(" ")
-    d = datetime.timedelta(seconds=datetime.datetime.now().timestamp() - int(a[0]) if a else 0)
-    dd = d.days
-    hh = d.seconds//3600
-    mm = (d.seconds//60)%60
-    cnt = len(self.gtremotebehindfiles(show=False).split(os.linesep))
-    return f"{cnt}/files {branch}/br\n{a[1]}/uid\n{dd:>02d}d:{hh:>02d}H:{mm:>02d}M/age"
-
-  def gtremotebehindfiles(self,show=True) -> str:
+    return self._gtcommits(f"origin/{branch}",branch,True,show)
+
+  def gtremotebehindfiles(self,show=True,max_lines:int=None) -> None:
     """ remote..local """
     branch = self.gtlocalbranch()
-    return self._cmdstr(["git","diff","--name-only",f"origin/{branch}...{branch}"],show=show).strip()
+    if self._gtdetached(branch): return
+    self._gtfiles(f"origin/{branch}",branch,show,max_lines)
 
-  def gtremotebehinddiff(self,show=True) -> str:
+  def gtremotebehinddiff(self,show=True,max_lines:int=None,stat:bool=False) -> None:
     """ remote..local """
     branch = self.gtlocalbranch()
-    return self._cmdstr(["git","diff",f"origin/{branch}...{branch}"],show=show).strip()
+    if self._gtdetached(branch): return
+    self._gtdiff([f"origin/{branch}...{branch}"],show,max_lines,stat)
 
   def gtfetch(self,show=True) -> None:
+    """ Fetch the remote branches. """
+    if self._gtoffline():
+      print("offline, not fetching")
+      return
     self._cmd(["git","fetch"],show=show)
+    self._gtinvalidate(remote=True)
+
+  def _gtmaintainlog(self) -> dict:
+    """ .mim/gtmaintain.json, whether git has the built-in fsmonitor, the last repack and the timings of each gtmaintain. """
+    try:
+      with open(os.path.join(self.state,"gtmaintain.json"),"r") as f:
+        return json.load(f)
+    except (FileNotFoundError,ValueError):
+      return {}
+
+  def _gtobjects(self) -> str:
+    """ The object directory, shared by the work trees. """
+    refs = self._gtrefs()
+    if refs.cli: return self._cmdstr(["git","rev-parse","--git-path","objects"],fail=False)
+    return os.path.join(refs.commondir,"objects") if refs.commondir else None
+
+  def _gtmaintenance(self) -> list:
+    """ The features speeding up the gt* queries that are missing, read in process for the status warning. """
+    objects = self._gtobjects()
+    if not objects or not os.path.isdir(objects): return []
+    missing = []
+    info = os.path.join(objects,"info")
+    if not os.path.exists(os.path.join(info,"commit-graph")) and not os.path.exists(os.path.join(info,"commit-graphs","commit-graph-chain")):
+      missing.append("commit-graph")
+    if not os.path.exists(os.path.join(objects,"pack","multi-pack-index")):
+      missing.append("multi-pack-index")
+    refs = self._gtrefs()
+    if refs.config("core.untrackedCache")[-1:] != ["true"]:
+      missing.append("untracked cache")
+    if self._gtmaintainlog().get("fsmonitor") and refs.config("core.fsmonitor")[-1:] != ["true"]:
+      missing.append("fsmonitor")
+    return missing
+
+  def _gtqueries(self) -> list:
+    """ (name,git command) of the gt* queries that slow down with many files and a long history. """
+    branch = self.gtlocalbranch()
+    snapshot = self._gtsnapshot()
+    queries = [("status",["git","status","--porcelain=v2","--branch","-z","--untracked-files=all"])]
+    left = "origin/main" if branch != "main" else f"origin/{branch}"
+    if branch and snapshot.has(left) and snapshot.has(branch):
+      queries.append(("log",["git","log","--left-right","--date=unix","--pretty=format:%m %ad %an",f"{left}...{branch}"]))
+      queries.append(("diff --name-only",["git","diff","--name-only",f"{left}...{branch}"]))
+    return queries
+
+  def _gttime(self,queries:list) -> dict:
+    """ [name]=seconds of each query, the best of two runs so what the first run caches (e.g. the untracked cache) counts. """
+    timings = {}
+    for name,cmd in queries:
+      runs = []
+      for i in range(2):
+        start = time.perf_counter()
+        self._cmd(cmd,fail=False)
+        runs.append(time.perf_counter()-start)
+      timings[name] = min(runs)
+    return timings
+
+  def _gtrepackdue(self,log:dict) -> bool:
+    """ Repack a week after the last one, or sooner when there are as many packs or loose objects as would trigger git gc --auto. """
+    counts = dict(line.split(": ",1) for line in self._cmd(["git","count-objects","-v"]) if ": " in line)
+    return (time.time()-log.get("repacked",0) > 7*24*3600
+            or int(counts.get("packs",0)) >= 50 or int(counts.get("count",0)) >= 6700)
+
+  def _gtpromisor(self) -> bool:
+    """ Is this a partial clone e.g. from gtclone --filter=blob:none, git can not repack its promisor packs geometrically. """
+    return [l for l in self._cmd(["git","config","--get-regexp",r"^remote\..*\.promisor$"],fail=False) if l.endswith(" true")] != []
+
+  def gtmaintain(self,show=True) -> None:
+    """ Turn on and refresh what keeps the gt* queries fast on a large repository: the commit-graph with changed-path
+        Bloom filters, the multi-pack-index, the untracked cache and core.fsmonitor where git has the built-in daemon.
+        Repacks geometrically when due, except in a partial clone. The queries are timed before and after, kept in .mim/gtmaintain.json.
+    """
+    if not self._gtrefs().resolve("HEAD"):
+      print("no commits, nothing to maintain")
+      return
+    log = self._gtmaintainlog()
+    queries = self._gtqueries()
+    before = self._gttime(queries)
+    log["fsmonitor"] = not [l for l in self._cmd(["git","fsmonitor--daemon","status"],fail=False)
+                            if "not supported" in l or "not a git command" in l]
+    settings = {"core.commitGraph":"true","fetch.writeCommitGraph":"true","core.untrackedCache":"true"}
+    if log["fsmonitor"]: settings["core.fsmonitor"] = "true"
+    for key,value in settings.items():
+      self._cmd(["git","config",key,value],show=show)
+    if self._gtpromisor():
+      print("partial clone, not repacking: git repack --geometric does not support promisor packs")
+    elif self._gtrepackdue(log):
+      self._cmd(["git","repack","-d","--geometric=2","--write-midx"],show=show)
+      log["repacked"] = time.time()
+    if not os.path.exists(os.path.join(self._gtobjects(),"pack","multi-pack-index")):
+      self._cmd(["git","multi-pack-index","write"],show=show)
+    self._cmd(["git","commit-graph","write","--reachable","--changed-paths"],show=show)
+    self._gtinvalidate()
+    after = self._gttime(queries)
+    log["runs"] = (log.get("runs",[])+[{"when":time.time(),"before":before,"after":after}])[-20:]
+    with open(self._statepath("gtmaintain.json"),"w") as f:
+      json.dump(log,f,indent=1)
+    from texttable import Texttable
+    table = Texttable(max_width=shutil.get_terminal_size().columns)
+    table.set_cols_align(["l","r","r","r"])
+    table.add_rows([["query","before","after","gain"]]+
+                   [[name,f"{before[name]:.3f}s",f"{after[name]:.3f}s",f"{before[name]/max(after[name],1e-6):.1f}x"] for name in before])
+    print(table.draw())
+    if not log["fsmonitor"]: print("fsmonitor: git has no built-in daemon on this platform")
 
   def _statuswarning(self) -> list:
+    """ Any warnings. """
+    warnings = super()._statuswarning()
     if self.gtlocalbranch() == "main":
-      return ["warning (git): You are working on the main branch. Hint: create a developer branch using 'gtbranch <branch name>'"]
-    
-  def _status_align(self) -> list:
-    """ Gather table alignment as "l" "r" "c" """
-    return super()._status_align()+["l","l","l","l","l","l"]
-
-  def _statusTitles(self) -> list:
-    """ Titles for status """
-    return super()._statusTitles()+[
-      "gtuntracked\n>local\ngtadd",
-      "gtmainahead\nmain>local\ngtrebasemain",
-      "gtremoteahead\nremote>local\ngtrebaseremote",
-      "gtuncommitted\nchange>local\ngtcommit or gtpush",
-      "gtremotebehind\nlocal>remote\ngtpush",
-      "gtmainbehind\nremote>main\ngtrelease"]
-
-  def _status(self) -> list:
-    """ Gather project status """
-    self.gtfetch(show=False)
-    untracked = self.gtuntracked(show=False)
-    remote = self.gtremoteahead(show=False)
-    main = self.gtmainahead(show=False)
-    localremote = self.gtmainbehind(show=False)
-    return super()._status()+[untracked,main,remote,self.gtuncommitted(),self.gtremotebehind(show=False),localremote]
-
-  def _upversion(self,version:str,oldversion:str) -> str:
-    """ Update files containing version from BUILDVERSION.txt. """
-    if os.path.exists(self.ci):
-      self._sed(self.ci,'docker_image_version\s*:.*',f'docker_image__version: {version}')
-
-  def upversion(self) -> None:
+      warnings.append("warning (git): You are working on the main branch. Hint: create a developer branch using 'gtbranch <branch name>'")
+    missing = self._gtmaintenance()
+    if missing:
+      warnings.append(f"warning (git): {', '.join(missing)} not set up, git queries are slower. Hint: run 'gtmaintain'")
+    return warnings
+
+  def gtremoteage(self,show=True) -> str:
+    """ Time since the remote refs were last fetched. """
+    age = self._gtfetchage()
+    return "never/fetched" if age is None else f"{self._gtage(time.time()-age)}/fetched"
+
+  def _gtremoteagecell(self) -> str:
+    """ gtremoteage for the status, noting when the refs are being fetched in the background or offline. """
+    fetch = self._once("gtfetch",self._gtfetch)
+    cell = self.gtremoteage(show=False)
+    if fetch == "background": cell += "\nfetching"
+    if fetch == "offline": cell += "\noffline"
+    return cell
+
+  def _gtfetched(self,probe):
+    """ Probe for a status column that needs the remote refs fetched first, the fetch runs once per the fetch policy. """
+    def fetched():
+      self._once("gtfetch",self._gtfetch)
+      return probe(show=False)
+    return fetched
+
+  def _gtwatch(self,*names) -> list:
+    """ Paths in the git directory, HEAD, index and FETCH_HEAD are per work tree and the refs are shared. """
+    refs = self._gtrefs()
+    if not refs.gitdir: return []
+    return [os.path.join(refs.gitdir if name in ["HEAD","index","FETCH_HEAD"] else refs.commondir,name) for name in names]
+
+  def _watchpaths(self) -> list:
+    """ Files and directories watch follows, each mixin appends its own. The work tree is for gtuntracked and gtuncommitted. """
+    return super()._watchpaths()+["."]+self._gtwatch("HEAD","index","FETCH_HEAD","refs","packed-refs")
+
+  def _watchnoise(self) -> list:
+    """ git status refreshes the index. """
+    return super()._watchnoise()+self._gtwatch("index")
+
+  def _statuscolumns(self) -> list:
+    """ Status columns (StatusColumn) in table order, each mixin appends its own. """
+    refs = self._gtwatch("HEAD","FETCH_HEAD","refs","packed-refs")
+    return super()._statuscolumns()+[
+      StatusColumn("gtuntracked\n>local\ngtadd","l",lambda: self.gtuntracked(show=False)),
+      StatusColumn("gtmainahead\nmain>local\ngtrebasemain","l",self._gtfetched(self.gtmainahead),refs),
+      StatusColumn("gtremoteahead\nremote>local\ngtrebaseremote","l",self._gtfetched(self.gtremoteahead),refs),
+      StatusColumn("gtuncommitted\nchange>local\ngtcommit or gtpush","l",lambda: self.gtuncommitted(show=False)),
+      StatusColumn("gtremotebehind\nlocal>remote\ngtpush","l",self._gtfetched(self.gtremotebehind),refs),
+      StatusColumn("gtmainbehind\nremote>main\ngtrelease","l",self._gtfetched(self.gtmainbehind),refs),
+      StatusColumn("gtremoteage\nremote\ngtfetch","l",self._gtremoteagecell,self._gtwatch("FETCH_HEAD"))]
+
+  def _upversion(self,version:str,oldversion:str,rewriter) -> None:
+    """ Add the edits of the files containing version from BUILDVERSION.txt to rewriter. """
+    super()._upversion(version,oldversion,rewriter)
+    rewriter.add(self.ci,r'docker_image_version\s*:.*',f'docker_image_version: {version}')
+
+  def upversion(self,dry_run:bool=False) -> None:
     """ Only up version when there are changes in the project """
-    a = self._cmd(['git','diff','name-only','origin/main'],show=True).split(os.linesep)
+    a = self._cmd(['git','diff','--name-only','origin/main'],show=True)
     if self.bv in a: return # Already changed the build version.
-    if a: super().upversion() # Other changes update version.
+    if a: super().upversion(dry_run) # Other changes update version.
 
 
   @classmethod
@@ -358,8 +632,20 @@ class GtMake(Make):
     super()._main(ap)
     ap.add_argument('-b', '--branch', help="Branch for gtbranch")
     cls.command_parameters["gtbranch"] = ["branch"]
-    ap.add_argument('-u', '--url', help="URL of remote git project for gtsetremote")
+    ap.add_argument('-u', '--url', help="URL of remote git project for gtsetremote and gtclone")
     cls.command_parameters["gtsetremote"] = ["url"]
+    cls.command_parameters["gtclone"] = ["url"]
+    ap.add_argument('--filter', help="Partial clone filter for gtclone e.g. blob:none, '' for a full clone, default [tool.makeitmine.git]")
+    ap.add_argument('--depth', type=int, help="Shallow clone depth for gtclone, default [tool.makeitmine.git]")
+    ap.add_argument('--sparse', help="Comma separated sparse-checkout cone directories for gtclone, default [tool.makeitmine.git]")
+    cls.command_parameters_optional["gtclone"] = ["filter","depth","sparse"]
+    ap.add_argument('--offline', action="store_true", help="Never fetch, the gt* commands use the remote tracking refs as they are, or set $MIM_OFFLINE=1")
+    cls.command_environment["offline"] = "MIM_OFFLINE"
+    ap.add_argument('-n', '--max-lines', type=int, help="Stop *diff and *files output after this many lines")
+    ap.add_argument('--stat', action="store_true", help="Only the per file summary of *diff")
+    for where in ["mainahead","mainbehind","remoteahead","remotebehind","uncommitted","untracked"]:
+      cls.command_parameters_optional[f"gt{where}files"] = ["max_lines"]
+      if where != "untracked": cls.command_parameters_optional[f"gt{where}diff"] = ["max_lines","stat"]
 
 
 if __name__ == "__main__":
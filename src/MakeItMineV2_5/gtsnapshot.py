@@ -0,0 +1,135 @@
+import os
+
+
+class GitSnapshot():
+  """ The git state for one invocation of a GtMake.
+      Each part is read once on first use, by one bulk git call or by GitRefs,
+      parts are memoized with Make._once under "gtsnapshot.<part>" so
+      concurrent status columns wait on the same call. The numbers agree with
+      each other until GtMake._gtinvalidate forgets them after a mutating
+      command (commit, switch, push, fetch).
+  """
+
+  def __init__(self,make):
+    self.make = make
+
+  def _part(self,key:str,fn,*args):
+    """ Load a part of the snapshot once. """
+    return self.make._once(f"gtsnapshot.{key}",fn,*args)
+
+  def _status(self,show:bool) -> dict:
+    """ Branch, upstream and the work tree from git status --porcelain=v2. """
+    s = {"branch":None,"oid":None,"upstream":None,"ahead":0,"behind":0,"changed":[],"untracked":[]}
+    out = self.make._cmdstr(["git","status","--porcelain=v2","--branch","-z","--untracked-files=all"],show=show)
+    fields = iter((out or "").split("\0"))
+    for f in fields:
+      if f.startswith("# branch.head "):
+        s["branch"] = None if f[14:] == "(detached)" else f[14:]
+      elif f.startswith("# branch.oid "):
+        s["oid"] = f[13:]
+      elif f.startswith("# branch.upstream "):
+        s["upstream"] = f[18:]
+      elif f.startswith("# branch.ab "):
+        ahead,behind = f[12:].split(" ")
+        s["ahead"] = int(ahead)
+        s["behind"] = -int(behind)
+      elif f.startswith("1 "): # 1 <XY> <sub> <mH> <mI> <mW> <hH> <hI> <path>
+        a = f.split(" ",8)
+        s["changed"].append((a[1],a[8],None))
+      elif f.startswith("2 "): # 2 <XY> <sub> <mH> <mI> <mW> <hH> <hI> <score> <path>\0<origPath>
+        a = f.split(" ",9)
+        s["changed"].append((a[1],a[9],next(fields)))
+      elif f.startswith("u "): # u <XY> <sub> <m1> <m2> <m3> <mW> <h1> <h2> <h3> <path>
+        a = f.split(" ",10)
+        s["changed"].append((a[1],a[10],None))
+      elif f.startswith("? "):
+        s["untracked"].append(f[2:])
+    return s
+
+  def _log(self,left:str,right:str,show:bool) -> tuple:
+    """ Commits on each side of left...right as lists of (unix time, author) newest first. """
+    sides = ([],[])
+    if left == right or not self.has(left) or not self.has(right): return sides
+    self.make._gtdeepen(left,right,show)
+    for line in self.make._cmd(["git","log","--left-right","--date=unix","--pretty=format:%m %ad %an",f"{left}...{right}"],show=show):
+      mark,ts,author = line.split(" ",2)
+      sides[0 if mark == "<" else 1].append((int(ts),author))
+    return sides
+
+  def _files(self,left:str,right:str,show:bool) -> list:
+    """ git diff --name-only left...right """
+    if left == right or not self.has(left) or not self.has(right): return []
+    self.make._gtdeepen(left,right,show)
+    return self.make._cmd(["git","diff","--name-only",f"{left}...{right}"],show=show)
+
+  def _stat(self,paths:list) -> list:
+    """ lstat of each path, None for a path deleted from the work tree. """
+    stats = []
+    for path in paths:
+      try:
+        stats.append(os.lstat(path))
+      except FileNotFoundError:
+        stats.append(None)
+    return stats
+
+  def _worktree(self,show:bool) -> dict:
+    """ Count, deleted count, oldest mtime and bytes of the uncommitted changes in one stat pass.
+        Many paths are stat'ed in chunks on a thread pool, lstat releases the GIL so the calls
+        overlap on a cold cache or a network file system.
+    """
+    paths = [path for xy,path,orig in self.changed(show)] # A rename is stat'ed at its new path.
+    if len(paths) < 256:
+      stats = self._stat(paths)
+    else:
+      import concurrent.futures
+      workers = self.make._workers()
+      size = -(-len(paths)//workers)
+      with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as pool:
+        stats = [st for part in pool.map(self._stat,[paths[i:i+size] for i in range(0,len(paths),size)]) for st in part]
+    present = [st for st in stats if st]
+    return {"count":len(paths),"deleted":len(paths)-len(present),
+            "oldest":min((st.st_mtime for st in present),default=None),"bytes":sum(st.st_size for st in present)}
+
+  def branch(self) -> str:
+    """ Local branch, None when detached. """
+    return self.make._gtrefs().branch()
+
+  def upstream(self) -> str:
+    """ Upstream of the local branch e.g. origin/<branch>, None when not tracking. """
+    branch = self.branch()
+    if branch is None: return None
+    return self.make._gtrefs().upstream(branch)
+
+  def changed(self,show:bool=False) -> list:
+    """ Uncommitted changes to tracked files as (XY, path, original path of a rename or None). """
+    return self._part("status",self._status,show)["changed"]
+
+  def untracked(self,show:bool=False) -> list:
+    """ Untracked files that are not ignored. """
+    return self._part("status",self._status,show)["untracked"]
+
+  def worktree(self,show:bool=False) -> dict:
+    """ Summary of the uncommitted changes: count, deleted, oldest (mtime, None when all are deleted) and bytes. """
+    return self._part("worktree",self._worktree,show)
+
+  def refs(self) -> dict:
+    """ [refname]=oid for local and remote tracking branches, read in process by GitRefs. """
+    return self._part("refs",self.make._gtrefs().refs)
+
+  def has(self,name:str) -> bool:
+    """ Is name a local branch or a remote tracking branch e.g. main or origin/main. """
+    refs = self.refs()
+    return f"refs/heads/{name}" in refs or f"refs/remotes/{name}" in refs
+
+  def log(self,left:str,right:str,show:bool=False) -> list:
+    """ Commits in right that are not in left (left..right) as (unix time, author) newest first.
+        Both directions of a pair come from the one git log --left-right call. Empty when either is None e.g. on a detached HEAD.
+    """
+    if left is None or right is None: return []
+    a,b = sorted([left,right])
+    sides = self._part(f"log.{a}...{b}",self._log,a,b,show)
+    return sides[0] if right == a else sides[1]
+
+  def files(self,left:str,right:str,show:bool=False) -> list:
+    """ Files changed in right since it forked from left (left...right). """
+    return self._part(f"files.{left}...{right}",self._files,left,right,show)
@@ -1,9 +1,26 @@
 import os
 import re
+import sys
 import argparse
+import shutil
+import threading
+import time
 import subprocess
-from texttable import Texttable
-from pathlib import Path
+
+
+class MakeError(Exception):
+  """ A command failed, raised instead of exiting when the Make is isolated e.g. one project of a workspace sweep. """
+  pass
+
+
+class StatusColumn():
+  """ One column of the status table, the probe is run as an independent task. """
+
+  def __init__(self,title:str,align:str,probe,watch:list=None):
+    self.title = title
+    self.align = align # "l" "r" "c"
+    self.probe = probe # callable returning the cell text.
+    self.watch = watch # paths whose change makes the cell stale in watch, None for any watched change.
 
 
 class Make():
@@ -12,9 +29,17 @@ class Make():
 
   def __init__(self,**kwargs):
     self.cwd = kwargs["cwd"]
-    self.home = Path.home()
+    self.home = os.path.expanduser("~")
     self.bv = "BUILD_VERSION.txt"
     self.readme = "README.md"
+    self.toml = "pyproject.toml"
+    self.state = ".mim" # State kept between invocations e.g. the target signatures.
+    self.isolated = kwargs.get("isolated",False) # True: failures raise MakeError instead of exiting.
+    self.interactive = kwargs.get("interactive",True) # False: interactive commands are failures.
+    self._lock = threading.Lock()
+    self._memo = {} # [key]=[done Event,result,exception], see _once.
+    self._warm = {"project"} # _once keys that stay valid across invocations of a daemon, see _reset.
+    self.tracer = None # Tracer recording the subprocesses when tracing, see _traced.
 
   def _files(self) -> list:
     """ Perminant files that can be created by this class. """
@@ -64,23 +89,11 @@ This project is licensed under the [NAME HERE] License - see the LICENSE.md file
       pass
 
   def _sed(self,fn:str,pattern:str,s:str) -> None:
-    """ Util: Change pattern to s if s not already in line that matches pattern. """
-    changed=False
-    hfn = os.path.join(os.path.dirname(fn),f".{os.path.basename(fn)}")
-    with open(fn,"r") as i:
-      with open(hfn,"w") as o:
-        for l in i:
-          nl = re.sub(pattern,s,l)
-          o.write(nl)
-          if l != nl:
-            if not changed:
-              print(f"sed 's/{pattern}/{s}/g' {fn}")
-              changed=True
-            print(f">>>{nl}")
-    if not changed:
-      os.remove(hfn)
-    else:
-      os.rename(hfn,fn)
+    """ Util: Change pattern to s in each line of fn, see Rewriter to batch several edits. """
+    from MakeItMineV2_5.rewriter import Rewriter
+    rewriter = Rewriter()
+    rewriter.add(fn,pattern,s)
+    rewriter.apply()
 
   def _grep(self,fn:str,pattern:str) -> str:
     """ util: Return lines in file that match pattern. """
@@ -91,14 +104,17 @@ This project is licensed under the [NAME HERE] License - see the LICENSE.md file
           retval.append(l)
     return "\n".join(retval)
 
-  def _cmd(self,cmd:list, show:bool=False, fail:bool=True) -> list:
-    """ util: Non-interactive stdin and stdout, this command captures stdin and stdout returning as a list of lines. """
+  def _cmd(self,cmd:list, show:bool=False, fail:bool=True, env:dict=None) -> list:
+    """ util: Non-interactive stdin and stdout, this command captures stdin and stdout returning as a list of lines.
+        env is added to the environment of the command.
+    """
     if show: print(" ".join(cmd))
-    proc = subprocess.run(cmd, capture_output=True, text=True)
+    start = self.tracer.now() if self.tracer else None
+    proc = subprocess.run(cmd, capture_output=True, text=True, env=dict(os.environ,**env) if env else None)
+    if self.tracer: self.tracer.record(cmd,start,proc.returncode,proc.stdout,proc.stderr,self._tracecaller())
     if proc.returncode != 0:
         if fail:
-          print(f"Failed to run '{' '.join(cmd)}' exit code={proc.returncode}{os.linesep}stderr={proc.stderr}stdout={proc.stdout}")
-          os._exit(1)
+          self._fail(f"Failed to run '{' '.join(cmd)}' exit code={proc.returncode}{os.linesep}stderr={proc.stderr}stdout={proc.stdout}")
     e = proc.stderr.strip().split(os.linesep)
     if not e[0]: e=[] # "".split(os.linesep) => ['']
     o = proc.stdout.strip().split(os.linesep)
@@ -113,29 +129,202 @@ This project is licensed under the [NAME HERE] License - see the LICENSE.md file
     if len(a): return os.linesep.join(a)
     return None
 
+  def _cmdstream(self,cmd:list,show:bool=False,fail:bool=True):
+    """ util: Yield the lines of stdout as the command writes them, memory stays flat however large the output.
+        Closing the generator early, e.g. after --max-lines, kills the command. stderr is kept for the failure message.
+    """
+    if show: print(" ".join(cmd))
+    start = self.tracer.now() if self.tracer else None
+    proc = subprocess.Popen(cmd,stdout=subprocess.PIPE,stderr=subprocess.PIPE,text=True,errors="replace")
+    err = []
+    reader = threading.Thread(target=lambda: err.append(proc.stderr.read()),daemon=True) # A full stderr pipe would block the command.
+    reader.start()
+    size = 0
+    try:
+      for line in proc.stdout:
+        if self.tracer: size += len(line.encode())
+        yield line
+    finally:
+      if proc.poll() is None: proc.kill()
+      proc.stdout.close()
+      proc.wait()
+      reader.join()
+      if self.tracer: self.tracer.record(cmd,start,proc.returncode,size,"".join(err),self._tracecaller())
+    if proc.returncode != 0 and fail:
+      self._fail(f"Failed to run '{' '.join(cmd)}' exit code={proc.returncode}{os.linesep}stderr={''.join(err)}")
+
+  def _page(self,lines,max_lines:int=None) -> None:
+    """ util: Print lines, any iterable e.g. a _cmdstream, as they come. On a terminal they go through
+        $PAGER (default less -FRX). Stops after max_lines, closing lines so a streaming command ends.
+    """
+    pager = None
+    out = sys.stdout
+    if self.interactive and sys.stdout.isatty():
+      cmd = os.environ.get("PAGER","less -FRX").split()
+      if cmd and shutil.which(cmd[0]):
+        sys.stdout.flush()
+        pager = subprocess.Popen(cmd,stdin=subprocess.PIPE,text=True)
+        out = pager.stdin
+    try:
+      for n,line in enumerate(lines):
+        if max_lines is not None and n >= max_lines:
+          out.write(f"... stopped after {max_lines} lines{os.linesep}")
+          break
+        out.write(line if line.endswith("\n") else line+os.linesep)
+    except BrokenPipeError: # The pager was quit.
+      pass
+    finally:
+      if hasattr(lines,"close"): lines.close()
+      if pager:
+        try:
+          pager.stdin.close()
+        except BrokenPipeError:
+          pass
+        pager.wait()
+
+  def _fail(self,msg:str) -> None:
+    """ util: Report a failure and exit, or raise MakeError when isolated so the caller carries on. """
+    if self.isolated: raise MakeError(msg)
+    print(msg)
+    if self.tracer: self.tracer.write() # os._exit skips the finally of _traced.
+    os._exit(1)
+
   def _substrin(self,s:str,a:list) -> bool:
     """ Substring in list of strings. """
     return [x for x in a if s in x] != []
 
-  def _cmdInteractive(self,cmd:list,show:bool=False) -> None:
-    """ util: Interactive stdin and stdout, this command outputs to the user and takes input from the user. """
+  def _cmdInteractive(self,cmd:list,show:bool=False) -> int:
+    """ util: Interactive stdin and stdout, this command outputs to the user and takes input from the user. Returns the exit code. """
     if show: print(" ".join(cmd))
-    subprocess.run(cmd)
-
-  def _rebuild_target(self,target:str,dependencies: list) -> bool:
-    """ util: Check if target needs rebuild based on its dependencies having a newer timestamp. """
-    if not os.path.exist(target):
-      print(f"{target} does not exist rebuilding")
-      return True
-    for dependency in dependencies:
-      if not os.path.exist(dependency):
-        print(f"{dependency} does not exist assuming it will be built when rebuilding {target}")
-        return True
-      if os.path.getmtime(dependency) > os.path.getmtime(target):
-        print(f"{target} is older than {dependency} and needs rebuilding")
-        return True
-    print(f"{target} is up to date")
-    return False
+    if not self.interactive: self._fail(f"'{' '.join(cmd)}' is interactive, run it in the project")
+    start = self.tracer.now() if self.tracer else None
+    proc = subprocess.run(cmd)
+    if self.tracer: self.tracer.record(cmd,start,proc.returncode,caller=self._tracecaller())
+    return proc.returncode
+
+  def _cmdbackground(self,cmd:list,show:bool=False) -> None:
+    """ util: Start a detached command and do not wait for it, its output is discarded. """
+    if show: print(" ".join(cmd))
+    start = self.tracer.now() if self.tracer else None
+    subprocess.Popen(cmd,stdin=subprocess.DEVNULL,stdout=subprocess.DEVNULL,stderr=subprocess.DEVNULL,start_new_session=True)
+    if self.tracer: self.tracer.record(cmd,start,None,caller=self._tracecaller())
+
+  def _tracecaller(self) -> str:
+    """ util: The Make methods on the stack that led to a subprocess, outermost first e.g. "status > gtuntracked > _gtsnapshot". """
+    names = []
+    f = sys._getframe(2)
+    while f:
+      if f.f_locals.get("self") is self and f.f_code.co_name not in ("_cmd","_cmdstr","_cmdInteractive","_once","_traced"):
+        names.append(f.f_code.co_name)
+      f = f.f_back
+    return " > ".join(reversed(names))
+
+  def _traced(self,path:str,command:str,fn):
+    """ util: Run fn recording every subprocess it starts, see MakeItMineV2_5.trace.
+        path is the Chrome trace to write, "1" for .mim/trace.json.
+    """
+    from MakeItMineV2_5.trace import Tracer
+    self.tracer = Tracer(command,self._statepath("trace.json") if path == "1" else path)
+    try:
+      return fn()
+    finally:
+      tracer,self.tracer = self.tracer,None
+      tracer.write()
+
+  def _once(self,key:str,fn,*args,**kwargs):
+    """ util: Run fn once per invocation, concurrent callers wait for the first caller's result. """
+    with self._lock:
+      slot = self._memo.get(key)
+      owner = slot is None
+      if owner:
+        slot = self._memo[key] = [threading.Event(),None,None]
+    if owner:
+      try:
+        slot[1] = fn(*args,**kwargs)
+      except BaseException as e:
+        slot[2] = e
+      slot[0].set()
+    slot[0].wait()
+    if slot[2] is not None: raise slot[2]
+    return slot[1]
+
+  def _forget(self,key:str) -> None:
+    """ util: Forget the result of _once for key and any "key.<sub key>", so the next caller runs it again. """
+    with self._lock:
+      for k in [k for k in self._memo if k == key or k.startswith(key+".")]:
+        del self._memo[k]
+
+  def _reset(self) -> None:
+    """ util: Start a new invocation, forgets every _once result except the warm ones that check their own freshness. """
+    with self._lock:
+      self._memo = {k:v for k,v in self._memo.items() if k in self._warm}
+
+  def _workers(self,workers:int=None) -> int:
+    """ util: Worker limit from the command line, else $MIM_WORKERS, else the thread pool default. """
+    if workers: return int(workers)
+    if os.environ.get("MIM_WORKERS"): return int(os.environ["MIM_WORKERS"])
+    return min(32,(os.cpu_count() or 1)+4)
+
+  def _statepath(self,name:str) -> str:
+    """ util: Path of a file in the project's state directory, e.g. the target signatures.
+        The directory gets a .gitignore of everything in it, so the state is never committed e.g. by gtadd.
+    """
+    ignore = os.path.join(self.state,".gitignore")
+    if not os.path.exists(ignore): # Also for a .mim made before it had one.
+      os.makedirs(self.state,exist_ok=True)
+      with open(ignore,"w") as f:
+        f.write(f"# MakeItMine state, not committed.{os.linesep}*{os.linesep}")
+    return os.path.join(self.state,name)
+
+  def _targets(self) -> list:
+    """ Build targets (Target) declared by this class, each mixin appends its own. """
+    from MakeItMineV2_5.target import Target # target, rewriter and projectinfo are imported when used, for a fast start.
+    return [Target("BUILDVERSION.txt",self.BUILDVERSION_dot_txt,outputs=[self.bv]),
+            Target("README.txt",self.README_dot_txt,outputs=[self.readme])]
+
+  def _build(self,name:str,workers:int=None) -> None:
+    """ util: Build a target after its stale dependencies. """
+    from MakeItMineV2_5.target import TargetGraph
+    if not TargetGraph(self._targets(),self._statepath("targets.json"),self._workers(workers)).build(name):
+      self._fail(f"{name} failed")
+
+  def _sharedcache(self):
+    """ util: The shared cache ($MIM_SHARED_CACHE a directory or http(s) URL), None when there is none. """
+    from MakeItMineV2_5.cache import shared_cache
+    return shared_cache(os.environ.get("MIM_SHARED_CACHE"))
+
+  def _sharedget(self,what:str,key:str,dest:str) -> dict:
+    """ util: Fetch a build into dest from the shared cache, returns its meta or None. """
+    shared = self._sharedcache()
+    if not shared: return None
+    try:
+      meta = shared.get(key,dest)
+    except OSError as e:
+      print(f"{what} shared cache unavailable: {e}")
+      return None
+    if meta:
+      print(f"{what} shared cache hit {key[:12]}, saved {meta.get('seconds',0):.1f}s of build")
+    else:
+      print(f"{what} shared cache miss {key[:12]}")
+    return meta
+
+  def _sharedput(self,what:str,key:str,files:list,**meta) -> None:
+    """ util: Push a successful build to the shared cache. """
+    shared = self._sharedcache()
+    if not shared: return
+    try:
+      shared.put(key,files,**meta)
+      print(f"{what} pushed {key[:12]} to the shared cache")
+    except OSError as e:
+      print(f"{what} failed to push {key[:12]} to the shared cache: {e}")
+
+  def targets(self) -> None:
+    """ List the build targets, their dependencies and why they are stale. """
+    from MakeItMineV2_5.target import TargetGraph
+    graph = TargetGraph(self._targets(),self._statepath("targets.json"),1)
+    for name,target in sorted(graph.targets.items()):
+      print(f"{name}: {' '.join(target.deps)}")
+      print(f"  {graph.stale(name) or 'up to date'}")
 
   def BUILDVERSION_dot_txt(self) -> None:
     """ Create the initial build version file. """
@@ -144,69 +333,136 @@ This project is licensed under the [NAME HERE] License - see the LICENSE.md file
       with open(self.bv,"w") as f:
         f.write(f"{name}:0.0.1{os.linesep}")
 
+  def _project(self) -> "ProjectInfo":
+    """ util: The project's metadata, read once and again only after BUILD_VERSION.txt or pyproject.toml changed. """
+    from MakeItMineV2_5.projectinfo import ProjectInfo
+    info = self._once("project",ProjectInfo,self.bv,self.toml)
+    if not info.fresh():
+      self._forget("project")
+      info = self._once("project",ProjectInfo,self.bv,self.toml)
+    return info
+
   def name(self) -> str:
     """ Get projects name """
     self.BUILDVERSION_dot_txt()
-    with open(self.bv,"r") as f:
-      for l in f:
-        m = re.search('^(.*):(.*)',l)
-        if m:
-          return m.group(1)
+    return self._project().name
 
   def version(self) -> str:
     """ Get projects version """
     self.BUILDVERSION_dot_txt()
-    with open(self.bv,"r") as f:
-      for l in f:
-        m = re.search('^(.*):(.*)',l)
-        if m:
-          return m.group(2)
+    return self._project().version
 
-  def _upversion(self,version:str,oldversion:str) -> None:
-    """ Update files containing version from BUILDVERSION.txt. """
-    pass
+  def _upversion(self,version:str,oldversion:str,rewriter:"Rewriter") -> None:
+    """ Add the edits of the files containing version from BUILDVERSION.txt to rewriter, each mixin adds its own. """
+    name = self.name()
+    rewriter.add(self.bv,f"^{re.escape(name)}:.*",f"{name}:{version}")
 
-  def upversion(self) -> None:
+  def upversion(self,dry_run:bool=False) -> None:
     """ Increment the project version number """
     oldversion = self.version()
     a = oldversion.split(".")
     version =f"{a[0]}.{a[1]}.{int(a[2])+1}"
-    name=self.name()
-    with open(self.bv,"w") as f:
-      f.write(f"{name}:{version}{os.linesep}")
-    self._upversion(version,oldversion)
+    from MakeItMineV2_5.rewriter import Rewriter
+    rewriter = Rewriter()
+    self._upversion(version,oldversion,rewriter)
+    if dry_run:
+      print(rewriter.diff())
+    else:
+      rewriter.apply()
+      self._forget("project")
 
-  def _statusTitles(self) -> list:
-    """ Titles for status """
+  def _statuscolumns(self) -> list:
+    """ Status columns (StatusColumn) in table order, each mixin appends its own. """
     return []
 
-  def _status(self) -> list:
-    """ Gather project status """
-    return []
-  
   def _statuswarning(self) -> list:
     """ Any warnings. """
     return []
 
-  def _status_align(self) -> list:
-    """ Gather table alignment as "l" "r" "c" """
-    return []  
+  def _statusrow(self,workers:int=None,columns:list=None) -> tuple:
+    """ Run the status probes concurrently, returns (warnings, cells) with cells in column order.
+        columns defaults to all of them.
+    """
+    import concurrent.futures
+    with concurrent.futures.ThreadPoolExecutor(max_workers=self._workers(workers)) as pool:
+      warnings = pool.submit(self._statuswarning)
+      cells = [pool.submit(column.probe) for column in (self._statuscolumns() if columns is None else columns)]
+      return warnings.result(),[self._statuscell(cell) for cell in cells]
+
+  def _statuscell(self,cell) -> str:
+    """ Result of a status probe (Future), when isolated a failed probe only fills its own cell. """
+    try:
+      return cell.result()
+    except MakeError as e:
+      return "error\n"+str(e).split(os.linesep)[0]
 
-  def status(self) -> None:
-    """ Status of the project. """
-    table = Texttable(max_width=os.get_terminal_size().columns)
-    align = self._status_align()
-    titles = self._statusTitles()
-    for warning in self._statuswarning():
+  def status(self,workers:int=None) -> None:
+    """ Status of the project, the columns are gathered concurrently. """
+    from texttable import Texttable
+    columns = self._statuscolumns()
+    warnings,body = self._statusrow(workers)
+    for warning in warnings:
       print(warning)
-    body = self._status()
-    if len(align) != len(titles):
-      print("Error length of title not matching alignment")
-      os._exit(1)
-    table.set_cols_align(align)
-    table.add_rows([titles]+[body])
+    table = Texttable(max_width=shutil.get_terminal_size().columns)
+    table.set_cols_align([column.align for column in columns])
+    table.add_rows([[column.title for column in columns]]+[body])
     print(table.draw())
 
+  def _watchpaths(self) -> list:
+    """ Files and directories watch follows, each mixin appends its own. """
+    return [self.bv,self.readme]
+
+  def _watchnoise(self) -> list:
+    """ Paths the status probes write themselves, their changes while the status is redrawn are ignored. """
+    return [self.state]
+
+  def _watchhit(self,changed:set,paths:list) -> bool:
+    """ util: Is a changed path one of paths or below one of them. """
+    paths = [os.path.abspath(p) for p in paths]
+    return [c for c in changed for p in paths if c == p or c.startswith(p+os.sep)] != []
+
+  def watch(self,workers:int=None) -> None:
+    """ Status kept on screen, only the cells whose watched files changed are recomputed, and the
+        $MIM_WATCH_TARGETS (default pybuild) are rebuilt after their inputs change. Ctrl-C ends.
+    """
+    from texttable import Texttable
+    from MakeItMineV2_5.watcher import Watcher
+    from MakeItMineV2_5.target import TargetGraph
+    columns = self._statuscolumns()
+    targets = {t.name:t for t in self._targets()}
+    rebuild = [t for t in os.environ.get("MIM_WATCH_TARGETS","pybuild").split(",") if t in targets]
+    debounce = float(os.environ.get("MIM_WATCH_DEBOUNCE","0.3"))
+    watcher = Watcher(self._watchpaths(),{".git","__pycache__","venv","node_modules","dist","build",".mim"})
+    cells = [""]*len(columns)
+    stale,changed = list(range(len(columns))),set()
+    try:
+      while True:
+        self._reset()
+        for name in rebuild:
+          if self._watchhit(changed,targets[name].inputs):
+            TargetGraph(self._targets(),self._statepath("targets.json"),self._workers(workers)).build(name)
+        start = time.time()
+        warnings,fresh = self._statusrow(workers,[columns[i] for i in stale])
+        for i,cell in zip(stale,fresh):
+          cells[i] = cell
+        if sys.stdout.isatty(): print("\033[H\033[2J",end="")
+        for warning in warnings:
+          print(warning)
+        table = Texttable(max_width=shutil.get_terminal_size().columns)
+        table.set_cols_align([column.align for column in columns])
+        table.add_rows([[column.title for column in columns],cells])
+        print(table.draw())
+        print(f"{time.strftime('%H:%M:%S')} {len(stale)}/{len(columns)} cells in {time.time()-start:.2f}s,"
+              f" {len(changed)} changed, {'inotify' if watcher.fd is not None else 'polling'} Ctrl-C ends")
+        noise = [os.path.abspath(p) for p in self._watchnoise()]
+        changed = {p for p in watcher.drain() if not self._watchhit({p},noise)}
+        if not changed: changed = watcher.changes(debounce)
+        stale = [i for i,column in enumerate(columns) if column.watch is None or self._watchhit(changed,column.watch)]
+    except KeyboardInterrupt:
+      pass
+    finally:
+      watcher.close()
+
   @classmethod
   def _main(cls,ap:argparse.ArgumentParser):
     """ Add extra parameters.
@@ -218,6 +474,14 @@ This project is licensed under the [NAME HERE] License - see the LICENSE.md file
     """
     cls.command_parameters={} # [cmd]=list(param:str)
     cls.command_parameters_optional={} # [cmd]=list(param:str)
+    cls.command_environment={} # [param]=environment variable set from it for any command e.g. --trace sets $MIM_TRACE.
+    ap.add_argument('-w', '--workers', type=int, help="Maximum concurrent tasks for status, ws*, venvsync and dkpull, default $MIM_WORKERS")
+    cls.command_parameters_optional["status"] = ["workers"]
+    cls.command_parameters_optional["watch"] = ["workers"]
+    ap.add_argument('--dry-run', action="store_true", help="Show the edits of upversion as a diff without writing them")
+    cls.command_parameters_optional["upversion"] = ["dry_run"]
+    ap.add_argument('-T', '--trace', action="store_true", help="Record the subprocesses of the command to .mim/trace.json (Chrome trace) and a summary, or set $MIM_TRACE to a path")
+    cls.command_environment["trace"] = "MIM_TRACE"
 
   @classmethod
   def genmakefile(cls,d:dict):
@@ -227,39 +491,19 @@ This project is licensed under the [NAME HERE] License - see the LICENSE.md file
 ifeq ($(MIM),)
   $(error $$MIM must be defined as the path to the MakeItMine project)
 endif
-MAKE:=$(MIM)/venv/bin/python -m MakeItMineV2_5.pjmake\n\n
+MAKE:=$(MIM)/venv/bin/python -m MakeItMineV2_5.mim\n\n
 """)
       for k,v in d.items():
         f.write(k+":\n")
         f.write(f"\t$(MAKE) {k}\n\n")
 
   @classmethod
-  def main(cls):
-    p = argparse.ArgumentParser(description="",
-                                formatter_class=argparse.RawTextHelpFormatter)
-    m = cls(cwd=os.getcwd())
-    d = {x.replace("_dot_","."):x+":"+(getattr(m,x).__doc__.strip() if getattr(m,x).__doc__ else "?") 
-         for x in dir(cls) if not x.startswith("_") and x !="main"
-         and not x.startswith("__Makefile__")}
-    d["genmakefile"] = cls.genmakefile.__doc__
-    p.add_argument('command', choices=d.keys(), help=os.linesep.join(d.values()))
-    cls._main(p)
-    a = p.parse_args()
-    if a.command == "genmakefile":
-      cls.genmakefile(d)
-      return
-    params = {}
-    if a.command in cls.command_parameters:
-      for param in cls.command_parameters[a.command]:
-        params[param] = getattr(a,param,None)
-        if not params[param]:
-          print(f"{a.command} missing --{param}")
-          return
-    if a.command in cls.command_parameters_optional:
-      for param in cls.command_parameters_optional[a.command]:
-        params[param] = getattr(a,param,None)
-    r = getattr(m,a.command)(**params)
-    if r is not None: print(r)
+  def main(cls,argv:list=None,make=None):
+    """ Run the command in argv (default sys.argv), make is an existing instance e.g. kept warm by mimd.
+        The commands come from a manifest cached by MakeItMineV2_5.registry, see there.
+    """
+    from MakeItMineV2_5 import registry
+    registry.main(cls,argv,make)
 
 
 if __name__ == "__main__":
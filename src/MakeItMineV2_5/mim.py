@@ -0,0 +1,42 @@
+import os
+import sys
+
+
+def _connect(path:str):
+  """ Socket connected to the daemon at path, None when none is running. socket is only loaded when there may be one. """
+  if not os.path.exists(path): return None
+  import socket
+  s = socket.socket(socket.AF_UNIX,socket.SOCK_STREAM)
+  try:
+    s.connect(path)
+    return s
+  except OSError:
+    s.close()
+    return None
+
+
+def main(argv:list=None) -> int:
+  """ Forward a command to the project's mimd daemon and return its exit code.
+      The client's stdin, stdout and stderr are passed over the socket, so the command's output
+      streams straight to the caller and interactive commands still work.
+      Without a daemon the command runs in this process, see registry for its fast start.
+  """
+  argv = sys.argv[1:] if argv is None else argv
+  s = _connect(os.path.join(os.getcwd(),".mim","mimd.sock"))
+  if s is None:
+    from MakeItMineV2_5 import registry
+    registry.main("MakeItMineV2_5.pjmake:PjMake",argv) # Imports only the module of the command.
+    return 0
+  import json
+  import socket
+  with s:
+    msg = json.dumps({"argv":argv,"cwd":os.getcwd(),"env":dict(os.environ)}).encode()
+    socket.send_fds(s,[len(msg).to_bytes(4,"big")+msg],[0,1,2])
+    reply = b""
+    for chunk in iter(lambda: s.recv(64),b""):
+      reply += chunk
+  return int(reply or b"1")
+
+
+if __name__ == "__main__":
+  sys.exit(main())
@@ -0,0 +1,167 @@
+import os
+import sys
+import json
+import time
+import socket
+import argparse
+import traceback
+from MakeItMineV2_5.make import MakeError
+from MakeItMineV2_5.pjmake import PjMake
+
+
+class Mimd():
+  """ Daemon running PjMake commands for mim clients on a Unix socket in the project directory.
+      A chain of make targets costs one interpreter start and the per-project caches stay warm
+      between commands. Commands run one at a time because each takes over the process's
+      stdin, stdout, stderr, environment and working directory from its client.
+  """
+
+  def __init__(self,cwd:str,idle:int=1800):
+    self.cwd = cwd
+    self.path = os.path.join(cwd,".mim","mimd.sock")
+    self.idle = idle # seconds without a command before the daemon exits.
+    self.makes = {} # [cwd]=PjMake
+
+  def _connect(self) -> socket.socket:
+    """ Connection to a running daemon, None when there is none. """
+    s = socket.socket(socket.AF_UNIX,socket.SOCK_STREAM)
+    try:
+      s.connect(self.path)
+      return s
+    except OSError:
+      s.close()
+      return None
+
+  def serve(self) -> None:
+    """ Accept commands until stopped or idle. """
+    PjMake(cwd=self.cwd)._statepath("mimd.sock") # Makes .mim, ignored by git.
+    if os.path.exists(self.path): os.remove(self.path) # Stale, start checked there is no daemon.
+    with socket.socket(socket.AF_UNIX,socket.SOCK_STREAM) as server:
+      server.bind(self.path)
+      server.listen()
+      server.settimeout(self.idle)
+      try:
+        while True:
+          try:
+            conn,_ = server.accept()
+          except socket.timeout:
+            break
+          with conn:
+            if not self._handle(conn): break
+      finally:
+        os.remove(self.path)
+
+  def _handle(self,conn:socket.socket) -> bool:
+    """ Run one client's command, False when the client asked the daemon to stop. """
+    conn.settimeout(None)
+    data,fds,_,_ = socket.recv_fds(conn,1<<16,3)
+    size = int.from_bytes(data[:4],"big")
+    data = data[4:]
+    while len(data) < size:
+      data += conn.recv(1<<16)
+    request = json.loads(data)
+    if request.get("stop"):
+      for fd in fds: os.close(fd)
+      conn.sendall(b"0")
+      return False
+    conn.sendall(str(self._run(request,fds)).encode())
+    return True
+
+  def _run(self,request:dict,fds:list) -> int:
+    """ Run the command with the client's fds, environment and working directory, returns the exit code. """
+    saved = [os.dup(fd) for fd in (0,1,2)]
+    env = dict(os.environ)
+    sys.stdout.flush()
+    sys.stderr.flush()
+    try:
+      for i,fd in enumerate(fds):
+        os.dup2(fd,i)
+      sys.stdout.reconfigure(line_buffering=True) # Stream to the client as the command prints.
+      os.environ.clear()
+      os.environ.update(request["env"])
+      os.chdir(request["cwd"])
+      make = self.makes.get(request["cwd"])
+      if make is None:
+        make = self.makes[request["cwd"]] = PjMake(cwd=request["cwd"],isolated=True)
+      make._reset()
+      PjMake.main(request["argv"],make)
+      return 0
+    except SystemExit as e:
+      return e.code if isinstance(e.code,int) else int(e.code is not None)
+    except MakeError as e:
+      print(e)
+      return 1
+    except Exception:
+      traceback.print_exc()
+      return 1
+    finally:
+      sys.stdout.flush()
+      sys.stderr.flush()
+      for i,fd in enumerate(saved):
+        os.dup2(fd,i)
+        os.close(fd)
+      for fd in fds:
+        os.close(fd)
+      os.environ.clear()
+      os.environ.update(env)
+      os.chdir(self.cwd)
+
+  def start(self,foreground:bool=False) -> None:
+    """ Start the daemon, detached from the terminal unless foreground. """
+    s = self._connect()
+    if s:
+      s.close()
+      print(f"mimd already running on {self.path}")
+      return
+    if foreground:
+      self.serve()
+      return
+    if os.fork():
+      for i in range(50): # Wait for the socket so the next make target finds the daemon.
+        if os.path.exists(self.path): break
+        time.sleep(0.1)
+      print(f"mimd started on {self.path}")
+      return
+    os.setsid()
+    if os.fork(): os._exit(0)
+    devnull = os.open(os.devnull,os.O_RDWR)
+    for fd in (0,1,2):
+      os.dup2(devnull,fd)
+    try:
+      self.serve()
+    finally:
+      os._exit(0)
+
+  def stop(self) -> None:
+    """ Stop a running daemon. """
+    s = self._connect()
+    if not s:
+      print("mimd is not running")
+      return
+    with s:
+      msg = json.dumps({"stop":True}).encode()
+      socket.send_fds(s,[len(msg).to_bytes(4,"big")+msg],[])
+      s.recv(8)
+    print("mimd stopped")
+
+  def status(self) -> None:
+    """ Is the daemon running. """
+    s = self._connect()
+    print(f"mimd running on {self.path}" if s else "mimd is not running")
+    if s: s.close()
+
+  @classmethod
+  def main(cls):
+    p = argparse.ArgumentParser(description="MakeItMine daemon, make targets run through MakeItMineV2_5.mim use it when running.")
+    p.add_argument('command', choices=["start","stop","status"])
+    p.add_argument('-f', '--foreground', action="store_true", help="start without detaching")
+    p.add_argument('-i', '--idle', type=int, default=1800, help="seconds idle before the daemon exits")
+    a = p.parse_args()
+    d = cls(os.getcwd(),a.idle)
+    if a.command == "start": d.start(a.foreground)
+    elif a.command == "stop": d.stop()
+    else: d.status()
+
+
+if __name__ == "__main__":
+  Mimd.main()
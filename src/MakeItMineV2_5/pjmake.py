@@ -2,11 +2,12 @@ from MakeItMineV2_5.make import Make
 from MakeItMineV2_5.dkmake import DkMake
 from MakeItMineV2_5.gtmake import GtMake
 from MakeItMineV2_5.pymake import PyMake
+from MakeItMineV2_5.wsmake import WsMake
 
-class PjMake(GtMake,PyMake,DkMake,Make):
+class PjMake(GtMake,PyMake,DkMake,WsMake,Make):
   """ Project make using other makes. """
   pass
 
 
 if __name__ == "__main__":
-  PjMake.main()
\ No newline at end of file
+  PjMake.main()
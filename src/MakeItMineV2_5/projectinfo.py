@@ -0,0 +1,98 @@
+import os
+import re
+
+
+def _scan(text:str) -> dict:
+  """ Tables, strings, integers and arrays of strings of a toml file, enough for ProjectInfo when there is no toml parser. """
+  toml = {}
+  table = toml
+  key = None # Array spanning lines.
+  for line in text.splitlines():
+    line = line.strip()
+    if key is not None:
+      table[key] += re.findall(r'"([^"]*)"',line)
+      if re.search(r'\]\s*(#.*)?$',line): key = None
+      continue
+    m = re.match(r'^\[([^\[\]]+)\]',line)
+    if m:
+      table = toml
+      for part in m.group(1).split("."):
+        table = table.setdefault(part.strip().strip('"'),{})
+      continue
+    m = re.match(r'^([\w-]+)\s*=\s*(.*)$',line)
+    if not m: continue
+    k,v = m.groups()
+    if v.startswith("["):
+      table[k] = re.findall(r'"([^"]*)"',v)
+      if not re.search(r'\]\s*(#.*)?$',v): key = k
+    elif v[:1] in ('"',"'"):
+      table[k] = v[1:v.find(v[0],1)]
+    elif re.match(r'^-?\d+\s*(#.*)?$',v):
+      table[k] = int(v.split("#")[0])
+  return toml
+
+
+def loads(text:str) -> dict:
+  """ Parse the text of a toml file, e.g. pyproject.toml read from git. """
+  try:
+    import tomllib # Only loaded once a toml file is parsed, it is most of the import time of a command.
+  except ModuleNotFoundError: # Python 3.10
+    try:
+      import tomli as tomllib
+    except ModuleNotFoundError:
+      return _scan(text)
+  return tomllib.loads(text)
+
+
+class ProjectInfo():
+  """ The project's metadata, BUILD_VERSION.txt (name:version) and pyproject.toml each read and parsed once,
+      pyproject.toml only when first used e.g. not for the name and version. fresh() tells when a file changed
+      since, see Make._project.
+  """
+
+  def __init__(self,bv:str,toml:str):
+    self.files = [bv,toml]
+    self.stamps = [self._stamp(fn) for fn in self.files]
+    self.name,self.version = None,None
+    try:
+      with open(bv,"r") as f:
+        for l in f:
+          m = re.search('^(.*):(.*)',l)
+          if m:
+            self.name,self.version = m.group(1),m.group(2).strip()
+            break
+    except FileNotFoundError:
+      pass
+    self._toml = None
+
+  def _stamp(self,fn:str) -> tuple:
+    try:
+      st = os.stat(fn)
+      return (st.st_mtime_ns,st.st_size)
+    except FileNotFoundError:
+      return None
+
+  def fresh(self) -> bool:
+    """ Are the files unchanged since they were read. """
+    return [self._stamp(fn) for fn in self.files] == self.stamps
+
+  @property
+  def toml(self) -> dict:
+    """ pyproject.toml, {} when there is none. """
+    if self._toml is None:
+      try:
+        with open(self.files[1],"rb") as f:
+          self._toml = loads(f.read().decode())
+      except FileNotFoundError:
+        self._toml = {}
+    return self._toml
+
+  @property
+  def project(self) -> dict:
+    """ The [project] table of pyproject.toml. """
+    return self.toml.get("project",{})
+
+  @property
+  def extras(self) -> list:
+    """ Names of the optional dependency groups e.g. test. """
+    return list(self.project.get("optional-dependencies",{}))
@@ -1,7 +1,16 @@
 import os
 import re
+import glob
+import json
+import time
+import shutil
+import hashlib
 import argparse
-from MakeItMineV2_5.make import Make
+from MakeItMineV2_5.make import Make, MakeError
+from MakeItMineV2_5.cache import BuildCache, VenvCache, digest, place
+from MakeItMineV2_5.wheelhouse import Wheelhouse, canonical, pins
+from MakeItMineV2_5.sitepackages import SitePackages
+from MakeItMineV2_5.projectinfo import ProjectInfo
 
 
 class PyMake(Make):
@@ -11,10 +20,15 @@ class PyMake(Make):
   def __init__(self,**kwargs):
     super().__init__(**kwargs)
     self.python_p = os.path.join("venv","bin","python")
-    self.toml = "pyproject.toml"
     self.download = os.path.join(self.home,".make_download")
     self.devreq = "dev_requirements.txt"
     self.prodreq = "prod_requirements.txt"
+    self.pyinitprune = {"__pycache__","venv","node_modules","build","dist"} # Not searched for __init__.py.
+    self.buildcache = os.path.join(self.home,".make_cache","build")
+    self.sitecache = os.path.join(self.home,".make_cache","sitepackages") # SitePackages per venv.
+    self.buildcachecap = int(os.environ.get("MIM_BUILD_CACHE_MB","1024"))*1024*1024
+    self.venvcache = os.path.join(self.home,".make_cache","venv")
+    self.venvcachecap = int(os.environ.get("MIM_VENV_CACHE_MB","4096"))*1024*1024
 
   def _files(self) -> list:
     """ Perminant files that can be created by this class. """
@@ -43,73 +57,247 @@ dependencies = [
 ]
 requires-python=">=3.10"
 
+[project.optional-dependencies]
 # dependencies for test/
 test = [
-  build
+  "build"
 ]
 [tool.hatch.build.targets.wheel]
 packages = ["src/{name}"]
 """)
 
+  def _pyinitstamp(self,path:str) -> list:
+    """ [inode,mtime_ns] of path, None when it does not exist. """
+    try:
+      st = os.stat(path)
+      return [st.st_ino,st.st_mtime_ns]
+    except FileNotFoundError:
+      return None
+
+  def _pyinitscan(self,top:str) -> tuple:
+    """ (__init__.py paths containing __version__, directories scanned) under top, the pyinitprune directories are skipped. """
+    found,dirs = [],[]
+    todo = [top] if os.path.isdir(top) else []
+    while todo:
+      d = todo.pop()
+      dirs.append(d)
+      with os.scandir(d) as entries:
+        for e in entries:
+          if e.is_dir(follow_symlinks=False):
+            if e.name not in self.pyinitprune and not e.name.startswith(".") and not e.name.endswith(".egg-info"):
+              todo.append(e.path)
+          elif e.name == "__init__.py":
+            with open(e.path,"r") as f:
+              text = f.read()
+            if "__version__" in text and re.search(r'^\s*__version__\s*=',text,re.M):
+              found.append(e.path)
+    return sorted(found),dirs
+
   def pyinit_dot_py_path(self) -> str:
     """ Find the path to the project's __init__.py that contains __version__.
         There should only be one.
+        The answer is kept in .mim/pyinit.json with the inode and mtime of the file and the directories
+        above it (of every directory scanned when there is none) and reused while those are unchanged.
     """
-    i = None
-    for root, dirs, files in os.walk("src"):
-      for file in files:
-        if "__init__.py" == file:
-          p=os.path.join(root,file)
-          with open(p,"r") as f:
-            for l in f:
-              if re.search('^\s*__version__\s*==',l):
-                if i:
-                  print(f"Cannot have two __init__.py both with __version__, pelase see {i} and {p}")
-                else:
-                  i=p
+    index = os.path.join(self.state,"pyinit.json")
+    try:
+      with open(index,"r") as f:
+        cached = json.load(f)
+      if all(self._pyinitstamp(p) == stamp for p,stamp in cached["stamps"].items()):
+        return cached["path"]
+    except (FileNotFoundError,ValueError,KeyError):
+      pass
+    found,dirs = self._pyinitscan("src")
+    if len(found) > 1:
+      print(f"Cannot have two __init__.py both with __version__, pelase see {found[0]} and {found[1]}")
+    i = found[0] if found else None
+    watched = dirs if i is None else [i]+[d for d in dirs if i.startswith(d+os.sep)]
+    with open(self._statepath("pyinit.json"),"w") as f:
+      json.dump({"path":i,"stamps":{p:self._pyinitstamp(p) for p in watched}},f)
     return i
 
   def init_dot_py(self) -> None:
     """ Create the init.py with __version__ used when importing a package i.e. package.__version__.
     """
     name=self.name()
-    version=self.projectVersion()
+    version=self.version()
     p=os.path.join("src",name,"__init__.py")
-    if os.path.exists(p):
-      if not self._grep(p,"__version__"):
-        with open(p,"a") as f:
-          f.write(f'__version__ = "{version}"n')
-      else:
-        with open(p,"w"):
-          f.write(f'''
+    if not os.path.exists(p):
+      os.makedirs(os.path.dirname(p),exist_ok=True)
+      with open(p,"w") as f:
+        f.write(f'''
 """{name}"""
 __version__ = "{version}"
 ''')
+    elif not self._grep(p,"__version__"):
+      with open(p,"a") as f:
+        f.write(f'__version__ = "{version}"{os.linesep}')
 
   def pyversion(self,packagename:str,show=True) -> str:
-    """ Return version of a package from the project of the same name in the workspace. """
-    python_p = os.path.abspath(os.path.join("..",packagename,"venv","bin","python"))
-    if not os.path.exists(python_p):
-      print(f"{python_p} not exists")
-      os._exit(1)
-    for line in self._cmd([python_p,"-m","pip","show",packagename],show=show).split(os.linesep):
-      m = re.search('^Version: (.*)',line)
-      if m:
-        return m.group(1)
-
-  def _upversion(self,version:str,oldversion:str) -> str:
-    """ Update files with the build version. """
-    self._sed(self.toml,'version\s*=\s*".*"',f'version = "{version}"')
+    """ Return version of a package from the project of the same name in the workspace, read from its venv without pip. """
+    project = os.path.abspath(os.path.join("..",packagename))
+    site = self._pysite(project)
+    if site is None:
+      self._fail(f"{project} has no venv")
+    if show: print(f"reading {site.path}")
+    dist = site.find(packagename)
+    return self._pydistversion(site,dist) if dist else None
+
+  def _pydistversion(self,site:SitePackages,dist:dict) -> str:
+    """ Version of an installed distribution, that of an editable project is read from its BUILD_VERSION.txt or pyproject.toml as they are now. """
+    location = site.location(dist) if dist["editable"] else None
+    if location:
+      info = ProjectInfo(os.path.join(location,self.bv),os.path.join(location,self.toml))
+      return info.version or info.project.get("version") or dist["version"]
+    return dist["version"]
+
+  def _upversion(self,version:str,oldversion:str,rewriter) -> None:
+    """ Add the edits of the files with the build version to rewriter. """
+    super()._upversion(version,oldversion,rewriter)
+    rewriter.add(self.toml,r'^version\s*=\s*".*"',f'version = "{version}"')
     p = self.pyinit_dot_py_path()
     if p:
-      self._sed(p,'_version__\s*==\s*[0-9.]*',f'__version__ == {version}')
+      rewriter.add(p,r'^__version__\s*=\s*["\'].*["\']',f'__version__ = "{version}"')
+
+  def _watchpaths(self) -> list:
+    """ Files and directories watch follows, each mixin appends its own. """
+    return super()._watchpaths()+["src",self.toml]
+
+  def _pysitepackages(self,project:str=".") -> str:
+    """ site-packages of the project's venv, None when there is no venv. """
+    a = glob.glob(os.path.join(project,"venv","lib","python*","site-packages"))
+    return a[0] if a else None
+
+  def _pysite(self,project:str=".") -> SitePackages:
+    """ The distributions installed in the project's venv, None when there is no venv. """
+    sitepackages = self._pysitepackages(project)
+    return SitePackages(sitepackages,self.sitecache) if sitepackages else None
+
+  def _targets(self) -> list:
+    """ Build targets (Target) declared by this class, each mixin appends its own. """
+    from MakeItMineV2_5.target import Target
+    sitepackages = self._pysitepackages()
+    return super()._targets()+[
+      Target("project.toml",self.project_dot_toml,outputs=[self.toml]), # Writes README.md only when it writes pyproject.toml.
+      Target("pyrequirements",self.pyrequirements,outputs=[self.devreq,self.prodreq],
+             stamps=[sitepackages] if sitepackages else []),
+      Target("pybuild",self._pybuild,inputs=["src",self.toml,self.bv,self.readme,self.prodreq],outputs=["dist"],
+             deps=["project.toml","pyrequirements"])]
+
+  def _pybuildkey(self) -> str:
+    """ Content hash of everything that goes into the wheel and tar. """
+    return digest(["src",self.toml,self.bv,self.readme,self.prodreq])
+
+  def _pyself(self) -> set:
+    """ Canonical names of this project as they appear in its requirements. """
+    return {canonical(n) for n in [self.name(),self._project().project.get("name")] if n}
+
+  def _pywheelhouse(self) -> Wheelhouse:
+    """ The wheels and sdists downloaded for every project, see Wheelhouse. """
+    return self._once("pywheelhouse",Wheelhouse,self.download)
+
+  def _pytags(self) -> list:
+    """ Wheel tags the venv's python installs, most specific first, asked once per interpreter. """
+    python = os.path.realpath(self.python_p)
+    key = f"{python} {os.stat(python).st_mtime_ns}"
+    tags = self._pywheelhouse().tags(key)
+    if tags is None:
+      tags = self._cmd([self.python_p,"-c","from pip._vendor.packaging.tags import sys_tags; print('\\n'.join(str(t) for t in sys_tags()))"])
+      self._pywheelhouse().settags(key,tags)
+    return tags
+
+  def _pyindex(self) -> list:
+    """ pip options for $MIM_WHEEL_INDEX, an index URL or a directory of wheels e.g. a local mirror, default is pip's configuration. """
+    index = os.environ.get("MIM_WHEEL_INDEX")
+    if not index: return []
+    if index.startswith("http://") or index.startswith("https://"): return ["--index-url",index]
+    return ["--no-index","--find-links",index]
+
+  def _pydownload(self,requirements:list,workers:int=None) -> list:
+    """ pip download each requirement, without its dependencies, concurrently into the wheelhouse.
+        Returns the file names downloaded for each requirement.
+    """
+    import tempfile
+    import concurrent.futures
+    tmp = tempfile.mkdtemp(prefix=".download",dir=self.download) # Same file system as the wheelhouse, files are moved in.
+    def download(i:int,requirement:str) -> list:
+      d = os.path.join(tmp,str(i))
+      self._cmd([self.python_p,"-m","pip","download","--no-deps","--quiet","-d",d,requirement]+self._pyindex(),show=True)
+      return [e.path for e in os.scandir(d)]
+    try:
+      with concurrent.futures.ThreadPoolExecutor(max_workers=self._workers(workers)) as pool:
+        downloaded = [f.result() for f in [pool.submit(download,i,r) for i,r in enumerate(requirements)]]
+      self._pywheelhouse().add([path for paths in downloaded for path in paths])
+      return [[os.path.basename(path) for path in paths] for paths in downloaded]
+    finally:
+      shutil.rmtree(tmp,ignore_errors=True)
+
+  def _pywheels(self,workers:int=None) -> tuple:
+    """ (file names in the wheelhouse, requirement lines) of the prod requirements other than this project.
+        The name==version pins are looked up in the wheelhouse index and only the missing ones are downloaded,
+        lines that are not pins, e.g. name>=1, always go to pip.
+    """
+    pinned,other = pins(self.prodreq) if os.path.exists(self.prodreq) else ({},[])
+    for name in self._pyself():
+      pinned.pop(name,None) # This project is the wheel pybuild builds.
+    other = [line for line in other if not line.startswith("-")] # Options and editables e.g. -e <path>.
+    wheelhouse = self._pywheelhouse()
+    tags = self._pytags()
+    missing = wheelhouse.missing(pinned,tags)
+    files = [wheelhouse.find(n,v,tags) for n,v in pinned.items() if n not in missing]
+    print(f"wheelhouse has {len(files)} of {len(pinned)+len(other)} requirements")
+    if missing or other:
+      for names in self._pydownload([f"{n}=={v}" for n,v in missing.items()]+other,workers):
+        files += names
+    return sorted(set(files)),[f"{n}=={v}" for n,v in pinned.items()]+other
+
+  def _pydist(self,wheels:list,requirements:list,built:list) -> None:
+    """ dist/download with the requirement's files hard linked from the wheelhouse and this project's wheel,
+        and dist/requirements.txt, as the Dockerfile installs them.
+    """
+    download = os.path.join("dist","download")
+    self._pywheelhouse().link(wheels,download)
+    for name in built:
+      if name.endswith(".whl"): place(os.path.join("dist",name),os.path.join(download,name))
+    with open(os.path.join("dist","requirements.txt"),"w") as f:
+      f.writelines(r+os.linesep for r in requirements)
+
+  def _pybuildenv(self) -> dict:
+    """ pip settings for the isolated environment build installs the build backend into: the wheelhouse first,
+        then $MIM_WHEEL_INDEX or pip's configuration. build has no pip options of its own.
+    """
+    index = self._pyindex()
+    if index[:1] == ["--no-index"]: return {"PIP_NO_INDEX":"1","PIP_FIND_LINKS":f"{self.download} {index[2]}"}
+    env = {"PIP_FIND_LINKS":self.download}
+    if index: env["PIP_INDEX_URL"] = index[1]
+    return env
+
+  def _pybuild(self) -> None:
+    """ Build the wheel and tar from the prod requirements, or take them from the build cache. """
+    wheels,requirements = self._pywheels()
+    cache = BuildCache(self.buildcache,self.buildcachecap)
+    key = self._pybuildkey()
+    files = cache.get(key,"dist")
+    if files:
+      print(f"pybuild cache hit {key[:12]}, saved {cache.meta(key).get('seconds',0):.1f}s of build {' '.join(files)}")
+    else:
+      print(f"pybuild cache miss {key[:12]}")
+      meta = self._sharedget("pybuild",key,"dist")
+      if meta:
+        files = meta["files"]
+        cache.put(key,[os.path.join("dist",n) for n in files],seconds=meta.get("seconds",0))
+      else:
+        start = time.time()
+        self._cmd([self.python_p,"-m","build",self.cwd],show=True,env=self._pybuildenv())
+        built = [e.path for e in os.scandir("dist") if e.is_file() and e.name.endswith((".whl",".tar.gz")) and e.stat().st_mtime >= start-1]
+        cache.put(key,built,seconds=time.time()-start)
+        self._sharedput("pybuild",key,built,seconds=time.time()-start)
+        files = [os.path.basename(path) for path in built]
+    self._pydist(wheels,requirements,files)
 
   def pybuild(self) -> None:
-    """ Build a Python distribution wheel and tar in local dist dir. """
-    self.pyrequirements()
-    # ignore means => dont re-download when exists.
-    self._cmd([self.python_p,"-m","pip","download","-d",self.download,"--exists-action","i","-r",self.prodreq],show=True)
-    self._cmd([self.python_p,"-m","build","--no-index","--find-links",self.download,self.cwd],show=True)
+    """ Build a Python distribution wheel and tar in local dist dir, when the sources or requirements changed. """
+    self._build("pybuild")
 
   def pycheck(self) -> None:
     """ Pip conf check for urls. """
@@ -125,17 +313,59 @@ __version__ = "{version}"
     if not T: print(f"missing trusted-host in {L}")
     if not I or not T: raise Exception("error in pypi conf")
 
+  def _pyrequirementlines(self,path:str) -> list:
+    """ Lines of a requirements file without this project, venv and prod_venv install it from its source. """
+    if not os.path.exists(path): return []
+    names = self._pyself()
+    lines = []
+    with open(path,"r") as f:
+      for line in f:
+        line = line.strip()
+        if not line or line.startswith("#"): continue
+        if line.startswith("-e ") and os.path.abspath(line[3:].strip()) == os.path.abspath(self.cwd): continue
+        if canonical(re.split(r"[\s\[=<>!~;@]",line,1)[0]) in names: continue
+        lines.append(line)
+    return lines
+
+  def _pyvenv(self,what:str,requirements:str,options:list,extras:list=[]) -> None:
+    """ Make venv a clone of the template venv for the python, the requirements without this project and the extras.
+        On a miss the template is built once, with pip install options -r requirements.
+    """
+    python = shutil.which("python")
+    if not python:
+      self._fail("python is not on the PATH")
+    python = os.path.realpath(python)
+    lines = self._pyrequirementlines(requirements)
+    key = hashlib.sha256(os.linesep.join([what,python,str(os.stat(python).st_mtime_ns),",".join(sorted(extras))]+lines).encode()).hexdigest()
+    cache = VenvCache(self.venvcache,self.venvcachecap)
+    if cache.meta(key):
+      print(f"{what} venv cache hit {key[:12]}, saved {cache.meta(key).get('seconds',0):.1f}s of install")
+    else:
+      print(f"{what} venv cache miss {key[:12]}")
+      def build(path:str) -> None:
+        # Raise rather than _fail, which exits, so put removes the partial template instead of keeping it.
+        if self._cmdInteractive(["python","-m","venv",path],show=True):
+          raise MakeError(f"Failed to create the {what} venv template")
+        if lines:
+          r = os.path.join(path,"requirements.txt")
+          with open(r,"w") as f:
+            f.writelines(line+os.linesep for line in lines)
+          if self._cmdInteractive([os.path.join(path,"bin","python"),"-m","pip","install"]+options+["-r",r],show=True):
+            raise MakeError(f"Failed to install {requirements} into the {what} venv template")
+      try:
+        cache.put(key,build)
+      except MakeError as e:
+        self._fail(str(e))
+    cache.get(key,"venv")
+
   def venv(self) -> None:
     """ Python venv with dependencies from dev_requirements.txt and then editable from pyproject.toml.
         Using downloaded packages, or whatever pypi is configured by the user.
+        The dependencies come from a template venv built once per python, requirements and extras.
     """
-    self._cmdInteractive(["python","-m","venv","venv"],show=True)
-    if os.path.exists(self.devreq):
-      self._cmdInteractive([self.python_p,"-m","pip","install","--find-links",self.download,"-r",self.devreq],show=True)
+    o = [extra for extra in ["test","lint"] if extra in self._project().extras] if os.path.exists(self.toml) else []
+    self._pyvenv("dev",self.devreq,["--find-links",self.download],o)
     if os.path.exists(self.toml):
-      o = []
-      if self._grep(self.toml,"^test\s*=\s*\["): o.append("test")
-      if self._grep(self.toml,"^lint\s*=\s*\["): o.append("lint")
       if o:
         self._cmdInteractive([self.python_p,"-m","pip","install","--find-links",self.download,"-e",self.cwd+f"[{','.join(o)}]"],show=True)
       else:
@@ -144,23 +374,92 @@ __version__ = "{version}"
   def prod_venv(self) -> None:
     """ Python venv with dependencies from prod_requirements.txt and then from pyproject.toml.
         Using downloaded packages only.
+        The dependencies come from a template venv built once per python and requirements.
     """
-    self._cmd(["python","-m","venv","venv"],show=True)
-    if os.path.exists(self.prodreq):
-      self._cmdInteractive([self.python_p,"-m","pip","install","--no-index","--find-links",self.download,"-r",self.prodreq],show=True)
+    self._pyvenv("prod",self.prodreq,["--no-index","--find-links",self.download])
     if os.path.exists(self.toml):
       self._cmdInteractive([self.python_p,"-m","pip","install","--no-index","--find-links",self.download,self.cwd],show=True)
 
+  def _pyfingerprint(self) -> str:
+    """ Hash of dev_requirements.txt, the venv's python and the mtime of its site-packages, changed by any install. """
+    h = hashlib.sha256(f"{os.path.realpath(self.python_p)} {os.stat(self._pysitepackages()).st_mtime_ns}".encode())
+    with open(self.devreq,"rb") as f:
+      h.update(f.read())
+    return h.hexdigest()
+
+  def _pyinstall(self,paths:list) -> None:
+    """ pip install wheels or sdists without their dependencies, in one pip process since pip does not lock
+        site-packages against another pip installing into the same venv.
+    """
+    if paths: self._cmd([self.python_p,"-m","pip","install","--no-deps","--no-index","--quiet"]+paths,show=True)
+
+  def venvsync(self,workers:int=None) -> None:
+    """ Make venv match dev_requirements.txt, only what changed is installed or removed.
+        The installed packages are read from their metadata, the pins to install come from the wheelhouse,
+        the missing ones downloaded concurrently, and are installed by a single pip. Returns at once when neither the
+        requirements nor the venv changed since the last sync.
+    """
+    if not os.path.exists(self.devreq):
+      self._fail(f"no {self.devreq}, run pyrequirements")
+    if not self._pysitepackages():
+      self.venv()
+    state = self._statepath("venvsync.json")
+    try:
+      with open(state,"r") as f:
+        if json.load(f)["fingerprint"] == self._pyfingerprint():
+          print("venv in sync")
+          return
+    except (FileNotFoundError,ValueError,KeyError):
+      pass
+    site = self._pysite()
+    installed = {canonical(d["name"]):d for d in site.distributions()}
+    pinned,other = pins(self.devreq)
+    keep = {"pip","setuptools","wheel","distribute"} # pip freeze leaves them out of the requirements.
+    located = {site.location(d):name for name,d in installed.items() if d["editable"]}
+    editables,unpinned = [],[]
+    for line in other:
+      if line.startswith("-e "):
+        path = os.path.abspath(line[3:].strip())
+        if path in located: keep.add(located[path])
+        else: editables.append(path)
+      elif not line.startswith("-"): # e.g. name @ url
+        name = canonical(re.split(r"[\s\[=<>!~;@]",line,1)[0])
+        keep.add(name)
+        if name not in installed or site.requirement(installed[name]) != line: unpinned.append(line)
+    install = {name:version for name,version in pinned.items()
+               if name not in installed or installed[name]["version"] != version or installed[name]["editable"] or installed[name]["url"]}
+    remove = [d["name"] for name,d in installed.items() if name not in pinned and name not in keep]
+    if remove:
+      self._cmd([self.python_p,"-m","pip","uninstall","--yes","--quiet"]+remove,show=True)
+    if install or unpinned:
+      wheelhouse = self._pywheelhouse()
+      tags = self._pytags()
+      missing = wheelhouse.missing(install,tags)
+      files = [wheelhouse.find(name,version,tags) for name,version in install.items() if name not in missing]
+      for names in self._pydownload([f"{n}=={v}" for n,v in missing.items()]+unpinned,workers):
+        files += names
+      self._pyinstall([os.path.join(self.download,name) for name in files])
+    for path in editables:
+      self._cmd([self.python_p,"-m","pip","install","--no-deps","--quiet","-e",path],show=True)
+    print(f"venvsync removed {len(remove)}, installed {len(install)+len(unpinned)} and {len(editables)} editable, {len(pinned)-len(install)} unchanged")
+    with open(state,"w") as f:
+      json.dump({"fingerprint":self._pyfingerprint()},f)
+
   def pyrequirements(self) -> None:
-    """ Uses pip freeze to create a requirements.txt and workspace_requirements.txt from venv. """
+    """ Create dev_requirements.txt and prod_requirements.txt from the venv, the lines pip freeze would give.
+        An editable project, assumed to be in the same workspace, is -e <path> for dev and name==version for prod.
+    """
+    site = self._pysite()
+    if site is None:
+      self._fail("no venv, run venv first")
     with open(self.devreq,"w") as dev, open(self.prodreq,"w") as prod:
-      for requirement in self._cmd([self.python_p,"-m","pip","freeze"],show=True).split("\n"):
-        if requirement.startswith("-e"):
-          m = re.search("#egg=(.*)",requirement)
-          if m:
-            dev.write("-e "+os.path.abspath(os.path.join("..",m.group(1)))+os.linesep) # Project installed editable assumed to be in the same workspace.
-            prod.write(requirement+"=="+self.pyversion(requirement,show=False)+os.linesep)
+      for dist in site.distributions():
+        if canonical(dist["name"]) in ["pip","setuptools","wheel","distribute"]: continue # Left out by pip freeze.
+        if dist["editable"]:
+          dev.write(f"-e {site.location(dist) or dist['url']}{os.linesep}")
+          prod.write(f"{dist['name']}=={self._pydistversion(site,dist)}{os.linesep}")
         else:
+          requirement = site.requirement(dist)
           dev.write(requirement+os.linesep)
           prod.write(requirement+os.linesep)
 
@@ -170,6 +469,7 @@ __version__ = "{version}"
     super()._main(ap)
     ap.add_argument('-p', '--packagename', help="Name of the package for pyversion")
     cls.command_parameters["pyversion"] = ["packagename"]
+    cls.command_parameters_optional["venvsync"] = ["workers"]
 
 
 if __name__ == "__main__":
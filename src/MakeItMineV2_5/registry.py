@@ -0,0 +1,160 @@
+import os
+import sys
+import json
+import argparse
+import importlib
+
+
+class _Recorder():
+  """ Stands in for the ArgumentParser given to _main, records the arguments so they can be replayed from the manifest. """
+
+  def __init__(self):
+    self.arguments = [] # [args,kwargs]
+
+  def add_argument(self,*args,**kwargs):
+    if "type" in kwargs: kwargs["type"] = kwargs["type"].__name__
+    self.arguments.append([list(args),kwargs])
+
+
+_types = {"int":int,"float":float,"str":str}
+
+
+def _signature() -> list:
+  """ [name,mtime_ns,size] of the package's modules, a change to any of them rebuilds the manifests. """
+  d = os.path.dirname(os.path.abspath(__file__))
+  return sorted([e.name,e.stat().st_mtime_ns,e.stat().st_size] for e in os.scandir(d) if e.name.endswith(".py"))
+
+
+def _path(module:str,name:str) -> str:
+  """ Manifest file of module.name. """
+  return os.path.join(os.path.expanduser("~"),".make_cache","registry",f"{module}.{name}.json")
+
+
+def _codenames(code) -> set:
+  """ Names used by a code object and the functions nested in it, identifier strings count
+      as names since a command may be dispatched by name e.g. wsgtfetch running "gtfetch".
+  """
+  names = set(code.co_names)
+  for c in code.co_consts:
+    if hasattr(c,"co_names"): names |= _codenames(c)
+    elif isinstance(c,str) and c.isidentifier(): names.add(c)
+  return names
+
+
+def _owner(cls,attr:str):
+  """ Smallest class of cls's mixins able to run attr.
+      Follows the methods attr can reach through their names, each needs the classes defining it
+      (all of them when it is a super() chain such as _statuscolumns) and the classes whose
+      __init__ sets it, falls back to cls when no single mixin has them all in its MRO.
+  """
+  import dis
+  mro = [c for c in cls.__mro__ if c is not object]
+  sets = {} # [class]=attributes its __init__ sets
+  for c in mro:
+    init = c.__dict__.get("__init__")
+    sets[c] = {i.argval for i in dis.get_instructions(init) if i.opname == "STORE_ATTR"} if init else set()
+  needed,seen,todo = set(),set(),[attr]
+  while todo:
+    n = todo.pop()
+    if n in seen: continue
+    seen.add(n)
+    for c in mro:
+      if n in sets[c]: needed.add(c)
+      if n not in c.__dict__: continue
+      needed.add(c)
+      f = c.__dict__[n]
+      f = getattr(f,"__func__",f) # classmethod
+      if hasattr(f,"__code__"): todo += list(_codenames(f.__code__))
+  candidates = [c for c in mro if needed <= set(c.__mro__)]
+  return min(candidates,key=lambda c: len(c.__mro__)) if candidates else cls
+
+
+def _modulename(c) -> str:
+  """ Importable module name of a class, a module run with -m is __main__ but has its real name in __spec__. """
+  m = sys.modules[c.__module__]
+  spec = getattr(m,"__spec__",None)
+  return spec.name if spec and c.__module__ == "__main__" else c.__module__
+
+
+def build(cls) -> dict:
+  """ The manifest of cls: each command's method, owner class and help, and the command line arguments. """
+  commands = {}
+  for x in dir(cls):
+    if x.startswith("_") or x == "main" or x.startswith("__Makefile__"): continue
+    doc = getattr(cls,x).__doc__
+    owner = _owner(cls,x)
+    commands[x.replace("_dot_",".")] = {"attr":x,"module":_modulename(owner),"class":owner.__name__,
+                                        "help":x+":"+(doc.strip() if doc else "?")}
+  commands["genmakefile"]["help"] = cls.genmakefile.__doc__
+  r = _Recorder()
+  cls._main(r)
+  return {"signature":_signature(),"commands":commands,"arguments":r.arguments,
+          "parameters":cls.command_parameters,"optional":cls.command_parameters_optional,
+          "environment":cls.command_environment}
+
+
+def load(module:str,name:str,cls=None) -> dict:
+  """ The cached manifest of module.name, rebuilt from cls, else by importing the class, when a module changed. """
+  path = _path(module,name)
+  try:
+    with open(path,"r") as f:
+      manifest = json.load(f)
+    if manifest["signature"] == _signature(): return manifest
+  except (FileNotFoundError,ValueError,KeyError):
+    pass
+  manifest = build(cls or getattr(importlib.import_module(module),name))
+  os.makedirs(os.path.dirname(path),exist_ok=True)
+  tmp = f"{path}.{os.getpid()}"
+  with open(tmp,"w") as f:
+    json.dump(manifest,f)
+  os.replace(tmp,path)
+  return manifest
+
+
+def main(target,argv:list=None,make=None) -> None:
+  """ Run the command in argv (default sys.argv) of target, a Make class or "module:Class".
+      Only the module of the class owning the command is imported, make is an existing
+      instance to run the command on e.g. kept warm by mimd.
+  """
+  if isinstance(target,str):
+    module,name = target.split(":")
+    target = None
+  else:
+    module,name = _modulename(target),target.__name__
+  manifest = load(module,name,target)
+  commands = manifest["commands"]
+  p = argparse.ArgumentParser(description="",
+                              formatter_class=argparse.RawTextHelpFormatter)
+  p.add_argument('command', choices=commands.keys(), help=os.linesep.join(c["help"] for c in commands.values()))
+  for args,kwargs in manifest["arguments"]:
+    if "type" in kwargs: kwargs["type"] = _types[kwargs["type"]]
+    p.add_argument(*args,**kwargs)
+  a = p.parse_args(argv)
+  command = commands[a.command]
+  if make is not None:
+    cls = type(make)
+  elif target and (command["module"],command["class"]) == (module,name):
+    cls = target
+  else:
+    cls = getattr(importlib.import_module(command["module"]),command["class"])
+  if a.command == "genmakefile":
+    cls.genmakefile({k:c["help"] for k,c in commands.items()})
+    return
+  params = {}
+  for param in manifest["parameters"].get(a.command,[]):
+    params[param] = getattr(a,param,None)
+    if not params[param]:
+      print(f"{a.command} missing --{param}")
+      return
+  for param in manifest["optional"].get(a.command,[]):
+    params[param] = getattr(a,param,None)
+  for param,var in manifest["environment"].items(): # Also seen by subprocesses e.g. the ws* workers, mimd restores the environment.
+    value = getattr(a,param,None)
+    if value: os.environ[var] = "1" if value is True else str(value)
+  m = make or cls(cwd=os.getcwd())
+  trace = os.environ.get("MIM_TRACE")
+  if trace:
+    r = m._traced(trace,a.command,lambda: getattr(m,command["attr"])(**params))
+  else:
+    r = getattr(m,command["attr"])(**params)
+  if r is not None: print(r)
@@ -0,0 +1,63 @@
+import os
+import re
+import shutil
+import difflib
+
+
+class Rewriter():
+  """ Batched regex edits of text files e.g. the version bump of upversion.
+      Edits are grouped per file with their patterns compiled once. Each file is read once,
+      every line goes through the file's edits in the order they were added, and a changed
+      file is written once, atomically through a temp file next to it.
+  """
+
+  def __init__(self):
+    self.edits = {} # [file]=list((compiled pattern,replacement))
+
+  def add(self,fn:str,pattern:str,replacement:str) -> None:
+    """ Replace pattern by replacement (re.sub per line, without its line ending) in fn, a missing file is skipped. """
+    edit = (re.compile(pattern),replacement)
+    edits = self.edits.setdefault(fn,[])
+    if edit not in edits: edits.append(edit)
+
+  def _rewrite(self,fn:str) -> tuple:
+    """ (old lines, new lines) of fn, None when it does not exist. """
+    try:
+      with open(fn,"r",newline="") as f:
+        old = f.readlines()
+    except FileNotFoundError:
+      return None
+    new = []
+    for line in old:
+      body = line.rstrip("\r\n")
+      end = line[len(body):]
+      for pattern,replacement in self.edits[fn]:
+        body = pattern.sub(replacement,body)
+      new.append(body+end)
+    return old,new
+
+  def plan(self) -> dict:
+    """ [file]=(old lines, new lines) of the files the edits change. """
+    changes = {}
+    for fn in self.edits:
+      lines = self._rewrite(fn)
+      if lines and lines[0] != lines[1]: changes[fn] = lines
+    return changes
+
+  def diff(self) -> str:
+    """ Unified diff of the edits, nothing is written. """
+    return "".join("".join(difflib.unified_diff(old,new,f"a/{fn}",f"b/{fn}")) for fn,(old,new) in self.plan().items())
+
+  def apply(self) -> list:
+    """ Write the changed files, returns their names. """
+    changes = self.plan()
+    for fn,(old,new) in changes.items():
+      tmp = os.path.join(os.path.dirname(fn),f".{os.path.basename(fn)}.{os.getpid()}")
+      with open(tmp,"w",newline="") as f:
+        f.writelines(new)
+      shutil.copymode(fn,tmp)
+      os.replace(tmp,fn)
+      print(f"rewrote {fn}")
+      for a,b in zip(old,new):
+        if a != b: print(f">>>{b.rstrip()}")
+    return list(changes)
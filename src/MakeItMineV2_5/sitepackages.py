@@ -0,0 +1,97 @@
+import os
+import json
+import hashlib
+import urllib.parse
+from MakeItMineV2_5.wheelhouse import canonical
+
+
+class SitePackages():
+  """ The distributions installed in a venv's site-packages, read from the *.dist-info (and legacy *.egg-info)
+      directories without starting pip: the name and version from the METADATA headers, and how it was
+      installed from direct_url.json. Kept in cache_dir per site-packages and reread when the mtime of the
+      site-packages directory changes, which it does on every install, upgrade or uninstall.
+  """
+
+  def __init__(self,path:str,cache_dir:str):
+    self.path = os.path.abspath(path)
+    self.cache = os.path.join(cache_dir,hashlib.sha256(self.path.encode()).hexdigest()[:16]+".json")
+    self._dists = None
+
+  def _headers(self,path:str) -> dict:
+    """ Name and Version of a METADATA or PKG-INFO file, only the headers are read. """
+    headers = {}
+    with open(path,"r",encoding="utf-8",errors="replace") as f:
+      for line in f:
+        if not line.strip(): break
+        key,_,value = line.partition(":")
+        if key in ["Name","Version"]: headers[key] = value.strip()
+    return headers
+
+  def _directurl(self,path:str) -> dict:
+    """ editable, url, vcs, commit and hash from direct_url.json (PEP 610), {} when installed from an index. """
+    try:
+      with open(path,"r") as f:
+        d = json.load(f)
+    except (FileNotFoundError,ValueError):
+      return {}
+    vcs = d.get("vcs_info",{})
+    hashes = d.get("archive_info",{}).get("hashes",{})
+    return {"editable":d.get("dir_info",{}).get("editable",False),"url":d.get("url"),
+            "vcs":vcs.get("vcs"),"commit":vcs.get("commit_id"),
+            "hash":d.get("archive_info",{}).get("hash") or (f"sha256={hashes['sha256']}" if "sha256" in hashes else None)}
+
+  def _scan(self) -> list:
+    dists = []
+    for e in os.scandir(self.path):
+      if e.name.endswith(".dist-info"):
+        metadata = os.path.join(e.path,"METADATA")
+      elif e.name.endswith(".egg-info"):
+        metadata = os.path.join(e.path,"PKG-INFO") if e.is_dir() else e.path
+      else:
+        continue
+      try:
+        headers = self._headers(metadata)
+      except (FileNotFoundError,NotADirectoryError):
+        continue
+      if "Name" not in headers: continue
+      dist = {"name":headers["Name"],"version":headers.get("Version",""),"editable":False,"url":None,"vcs":None,"commit":None,"hash":None}
+      dist.update(self._directurl(os.path.join(e.path,"direct_url.json")))
+      dists.append(dist)
+    return sorted(dists,key=lambda d: canonical(d["name"]))
+
+  def distributions(self) -> list:
+    """ dict(name,version,editable,url,vcs,commit,hash) of every distribution, in pip freeze order. """
+    if self._dists is not None: return self._dists
+    mtime = os.stat(self.path).st_mtime_ns
+    try:
+      with open(self.cache,"r") as f:
+        cached = json.load(f)
+      if cached["path"] == self.path and cached["mtime_ns"] == mtime:
+        self._dists = cached["dists"]
+        return self._dists
+    except (FileNotFoundError,ValueError,KeyError):
+      pass
+    self._dists = self._scan()
+    os.makedirs(os.path.dirname(self.cache),exist_ok=True)
+    tmp = f"{self.cache}.{os.getpid()}"
+    with open(tmp,"w") as f:
+      json.dump({"path":self.path,"mtime_ns":mtime,"dists":self._dists},f)
+    os.replace(tmp,self.cache)
+    return self._dists
+
+  def find(self,name:str) -> dict:
+    """ The distribution named name, None when not installed. """
+    for dist in self.distributions():
+      if canonical(dist["name"]) == canonical(name): return dist
+    return None
+
+  def location(self,dist:dict) -> str:
+    """ Directory of a distribution installed from a local directory e.g. an editable project, else None. """
+    if not dist["url"] or not dist["url"].startswith("file://"): return None
+    return urllib.parse.unquote(urllib.parse.urlparse(dist["url"]).path)
+
+  def requirement(self,dist:dict) -> str:
+    """ The pip freeze line of a distribution that is not editable. """
+    if dist["vcs"]: return f"{dist['name']} @ {dist['vcs']}+{dist['url']}@{dist['commit']}"
+    if dist["url"]: return f"{dist['name']} @ {dist['url']}"+(f"#{dist['hash']}" if dist["hash"] else "")
+    return f"{dist['name']}=={dist['version']}"
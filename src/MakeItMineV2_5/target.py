@@ -0,0 +1,148 @@
+import os
+import json
+import hashlib
+import threading
+
+
+class Target():
+  """ A build step declared by a mixin in _targets. """
+
+  def __init__(self,name:str,action,inputs:list=(),outputs:list=(),deps:list=(),stamps:list=()):
+    self.name = name
+    self.action = action   # callable that builds the outputs.
+    self.inputs = inputs   # files or directories (walked) compared by content.
+    self.outputs = outputs # files or directories created by the action, missing means stale.
+    self.deps = deps       # names of the targets built first.
+    self.stamps = stamps   # files or directories compared by their own mtime only e.g. site-packages.
+
+
+class TargetGraph():
+  """ Builds a target after its dependencies, independent targets run in parallel on a thread pool.
+      A target is stale when an output is missing or an input changed since the target last built.
+      An input changed when its mtime or size differs from the recorded one and then its sha256
+      differs as well, so touching a file does not cause a rebuild.
+      The signatures are recorded in a json state file.
+  """
+
+  def __init__(self,targets:list,state:str,workers:int):
+    self.targets = {t.name:t for t in targets}
+    self.statefn = state
+    self.workers = workers
+    self.prune = {"__pycache__",".git",".mim"}
+    self.lock = threading.Lock()
+    try:
+      with open(state,"r") as f:
+        self.state = json.load(f) # [target][path]=[mtime_ns,size,sha256]
+    except (FileNotFoundError,ValueError):
+      self.state = {}
+
+  def _closure(self,name:str) -> list:
+    """ name and the targets it depends on, dependencies first. """
+    order = []
+    def visit(n:str,path:list) -> None:
+      if n in path: raise ValueError(f"target cycle {' -> '.join(path+[n])}")
+      if n in order: return
+      if n not in self.targets: raise ValueError(f"no target {n}")
+      for d in self.targets[n].deps:
+        visit(d,path+[n])
+      order.append(n)
+    visit(name,[])
+    return order
+
+  def _walk(self,path:str) -> list:
+    """ Files of an input, a directory is walked. """
+    if not os.path.isdir(path): return [path] if os.path.exists(path) else []
+    files = []
+    for root,dirs,names in os.walk(path):
+      dirs[:] = sorted(d for d in dirs if d not in self.prune)
+      files += [os.path.join(root,n) for n in sorted(names)]
+    return files
+
+  def _sha256(self,path:str) -> str:
+    """ Hash of a file's content. """
+    h = hashlib.sha256()
+    with open(path,"rb") as f:
+      for chunk in iter(lambda: f.read(1<<20),b""):
+        h.update(chunk)
+    return h.hexdigest()
+
+  def _signature(self,target:Target) -> dict:
+    """ [path]=[mtime_ns,size,sha256] of the inputs, the recorded hash is reused when mtime and size match. """
+    recorded = self.state.get(target.name,{})
+    sig = {}
+    for path in [p for i in target.inputs for p in self._walk(i)]:
+      st = os.stat(path)
+      old = recorded.get(path)
+      if old and old[0] == st.st_mtime_ns and old[1] == st.st_size:
+        sig[path] = old
+      else:
+        sig[path] = [st.st_mtime_ns,st.st_size,self._sha256(path)]
+    for path in target.stamps:
+      if os.path.exists(path): sig[path] = [os.stat(path).st_mtime_ns,None,None]
+    return sig
+
+  def _stale(self,target:Target,sig:dict) -> str:
+    """ Why the target needs building, None when it is up to date. """
+    for output in target.outputs:
+      if not os.path.exists(output): return f"{output} does not exist"
+    if target.name not in self.state: return "never built" if sig else None
+    recorded = self.state[target.name]
+    for path in sorted(set(sig)|set(recorded)):
+      if path not in sig: return f"{path} was removed"
+      if path not in recorded: return f"{path} is new"
+      if path in target.stamps and sig[path][0] != recorded[path][0]: return f"{path} changed"
+      if sig[path][2] != recorded[path][2]: return f"{path} changed"
+    return None
+
+  def _run(self,target:Target) -> bool:
+    """ Build the target when stale, False when the action failed. """
+    sig = self._signature(target)
+    reason = self._stale(target,sig)
+    if not reason:
+      print(f"{target.name} is up to date")
+      return True
+    print(f"{target.name} rebuilding, {reason}")
+    try:
+      target.action()
+    except (Exception,SystemExit) as e:
+      print(f"{target.name} failed: {e}")
+      return False
+    with self.lock:
+      self.state[target.name] = sig
+    return True
+
+  def _save(self) -> None:
+    """ Write the state file atomically. """
+    os.makedirs(os.path.dirname(self.statefn) or ".",exist_ok=True)
+    tmp = f"{self.statefn}.{os.getpid()}"
+    with open(tmp,"w") as f:
+      json.dump(self.state,f)
+    os.replace(tmp,self.statefn)
+
+  def stale(self,name:str) -> str:
+    """ Why the target needs building, None when it is up to date. """
+    target = self.targets[name]
+    return self._stale(target,self._signature(target))
+
+  def build(self,name:str) -> bool:
+    """ Build name and its stale dependencies, False when a target failed. """
+    import concurrent.futures
+    order = self._closure(name)
+    waiting = list(order)
+    done = {} # [name]=bool
+    running = {} # [Future]=name
+    with concurrent.futures.ThreadPoolExecutor(max_workers=self.workers) as pool:
+      while waiting or running:
+        for n in [n for n in waiting if all(d in done for d in self.targets[n].deps)]:
+          waiting.remove(n)
+          if [d for d in self.targets[n].deps if not done[d]]:
+            print(f"{n} skipped, a dependency failed")
+            done[n] = False
+          else:
+            running[pool.submit(self._run,self.targets[n])] = n
+        if not running: continue
+        finished,_ = concurrent.futures.wait(running,return_when=concurrent.futures.FIRST_COMPLETED)
+        for future in finished:
+          done[running.pop(future)] = future.result()
+    self._save()
+    return done[name]
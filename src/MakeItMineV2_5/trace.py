@@ -0,0 +1,86 @@
+import os
+import sys
+import json
+import time
+import threading
+
+
+class Tracer():
+  """ Records the subprocesses of one invocation: argv, start, duration, exit code, bytes of
+      stdout and stderr and the Make method that ran them.
+      Written as Chrome trace JSON (chrome://tracing, ui.perfetto.dev) and a text summary of
+      the time per program and subcommand, slowest first.
+  """
+
+  def __init__(self,command:str,path:str):
+    self.command = command
+    self.path = path # Chrome trace, the summary goes to path.txt.
+    self.start = time.perf_counter_ns()
+    self.lock = threading.Lock()
+    self.calls = [] # dict per subprocess, see record.
+    self.tids = {} # [thread ident]=small id for the trace viewer.
+
+  def now(self) -> int:
+    """ ns since the invocation started. """
+    return time.perf_counter_ns()-self.start
+
+  def record(self,argv:list,start:int,code:int,stdout=None,stderr=None,caller:str=None) -> None:
+    """ Record a finished subprocess, start is from now().
+        stdout and stderr are the text or its size in bytes, None when it went to the terminal.
+    """
+    end = self.now()
+    with self.lock:
+      tid = self.tids.setdefault(threading.get_ident(),len(self.tids)+1)
+      self.calls.append({"argv":list(argv),"start":start,"duration":end-start,"exit":code,"tid":tid,"caller":caller,
+                         "stdout":len(stdout.encode()) if isinstance(stdout,str) else stdout,
+                         "stderr":len(stderr.encode()) if isinstance(stderr,str) else stderr})
+
+  def _name(self,argv:list) -> str:
+    """ Program and subcommand e.g. "git status". """
+    words = [os.path.basename(argv[0])] if argv else ["?"]
+    for a in argv[1:]:
+      if a.startswith("-"): continue
+      words.append(a)
+      break
+    return " ".join(words)
+
+  def chrome(self) -> dict:
+    """ Chrome trace events, the invocation is the outer slice. """
+    pid = os.getpid()
+    events = [{"name":self.command,"cat":"command","ph":"X","ts":0,"dur":self.now()/1000,"pid":pid,"tid":0}]
+    for c in self.calls:
+      events.append({"name":self._name(c["argv"]),"cat":"subprocess","ph":"X","ts":c["start"]/1000,"dur":c["duration"]/1000,
+                     "pid":pid,"tid":c["tid"],"args":{k:c[k] for k in ("argv","exit","stdout","stderr","caller")}})
+    return {"traceEvents":events,"displayTimeUnit":"ms"}
+
+  def summary(self,slowest:int=10) -> str:
+    """ Total time per program and subcommand, then the slowest calls. """
+    total = self.now()
+    groups = {} # [name]=[calls,ns,max ns]
+    for c in self.calls:
+      g = groups.setdefault(self._name(c["argv"]),[0,0,0])
+      g[0] += 1
+      g[1] += c["duration"]
+      g[2] = max(g[2],c["duration"])
+    spent = sum(c["duration"] for c in self.calls)
+    lines = [f"{self.command}: {total/1e6:.1f}ms, {len(self.calls)} subprocesses {spent/1e6:.1f}ms (summed over threads)",
+             f"{'ms':>9} {'calls':>5} {'max ms':>8}  command"]
+    for name,(n,ns,mx) in sorted(groups.items(),key=lambda g: -g[1][1]):
+      lines.append(f"{ns/1e6:9.1f} {n:5d} {mx/1e6:8.1f}  {name}")
+    lines.append("slowest calls")
+    for c in sorted(self.calls,key=lambda c: -c["duration"])[:slowest]:
+      out = "tty" if c["stdout"] is None else f"{c['stdout']}B"
+      lines.append(f"{c['duration']/1e6:9.1f} exit={c['exit']} out={out} {c['caller'] or '?'}: {' '.join(c['argv'])}")
+    return os.linesep.join(lines)
+
+  def write(self) -> None:
+    """ Write the Chrome trace to path and the summary to path.txt, the summary is also shown on stderr. """
+    path = self.path
+    os.makedirs(os.path.dirname(path) or ".",exist_ok=True)
+    with open(path,"w") as f:
+      json.dump(self.chrome(),f)
+    summary = self.summary()
+    with open(f"{path}.txt","w") as f:
+      f.write(summary+os.linesep)
+    print(summary,file=sys.stderr)
+    print(f"trace written to {path} and {path}.txt",file=sys.stderr)
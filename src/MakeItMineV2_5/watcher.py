@@ -0,0 +1,132 @@
+import os
+import time
+import struct
+import select
+
+
+_IN_MODIFY,_IN_ATTRIB,_IN_CLOSE_WRITE = 0x2,0x4,0x8
+_IN_MOVED_FROM,_IN_MOVED_TO,_IN_CREATE,_IN_DELETE = 0x40,0x80,0x100,0x200
+_IN_DELETE_SELF,_IN_MOVE_SELF,_IN_Q_OVERFLOW,_IN_ISDIR = 0x400,0x800,0x4000,0x40000000
+_MASK = (_IN_MODIFY|_IN_ATTRIB|_IN_CLOSE_WRITE|_IN_MOVED_FROM|_IN_MOVED_TO|_IN_CREATE|_IN_DELETE
+         |_IN_DELETE_SELF|_IN_MOVE_SELF)
+
+
+class Watcher():
+  """ Reports the files that changed under a set of roots, a root is a file or a directory watched recursively.
+      Uses Linux inotify through ctypes, one watch per directory and new directories are added as they
+      appear, else polls the mtime and size of every file every interval seconds.
+  """
+
+  def __init__(self,roots:list,prune:set,interval:float=1.0):
+    self.roots = [os.path.abspath(r) for r in roots]
+    self.prune = prune # Directory names not watched.
+    self.interval = interval
+    self.fd = None
+    self.wds = {} # [watch descriptor]=directory
+    try:
+      import ctypes
+      self.libc = ctypes.CDLL(None,use_errno=True)
+      fd = self.libc.inotify_init1(os.O_NONBLOCK|os.O_CLOEXEC)
+      if fd >= 0: self.fd = fd
+    except (OSError,AttributeError): # Not Linux.
+      pass
+    if self.fd is None:
+      self.mtimes = self._scan()
+      return
+    for root in self.roots:
+      if os.path.isdir(root):
+        self._addtree(root)
+      else:
+        self._add(os.path.dirname(root)) # Also sees the file replaced by a rename, e.g. .git/index.
+
+  def _dirs(self,top:str) -> list:
+    """ top and its directories, pruned. """
+    dirs,todo = [],[top]
+    while todo:
+      d = todo.pop()
+      dirs.append(d)
+      try:
+        with os.scandir(d) as entries:
+          todo += [e.path for e in entries if e.is_dir(follow_symlinks=False) and e.name not in self.prune]
+      except OSError:
+        pass
+    return dirs
+
+  def _add(self,d:str) -> None:
+    wd = self.libc.inotify_add_watch(self.fd,os.fsencode(d),_MASK)
+    if wd >= 0: self.wds[wd] = d
+
+  def _addtree(self,top:str) -> None:
+    for d in self._dirs(top):
+      self._add(d)
+
+  def _watched(self,path:str) -> bool:
+    """ Is path one of the roots or below a directory root and not in a pruned directory e.g. .git/index.lock. """
+    return [r for r in self.roots if path == r or path.startswith(r+os.sep)
+            and not self.prune.intersection(path[len(r)+1:].split(os.sep)[:-1])] != []
+
+  def _scan(self) -> dict:
+    """ [path]=(mtime_ns,size) of the files under the roots. """
+    mtimes = {}
+    for root in self.roots:
+      for d in self._dirs(root) if os.path.isdir(root) else [None]:
+        try:
+          paths = [root] if d is None else [e.path for e in os.scandir(d) if not e.is_dir(follow_symlinks=False)]
+        except OSError: # Removed while scanning.
+          continue
+        for path in paths:
+          try:
+            st = os.stat(path)
+            mtimes[path] = (st.st_mtime_ns,st.st_size)
+          except OSError:
+            pass
+    return mtimes
+
+  def _poll(self) -> set:
+    """ Paths whose mtime or size changed since the last scan. """
+    mtimes = self._scan()
+    changed = {p for p in set(mtimes)|set(self.mtimes) if mtimes.get(p) != self.mtimes.get(p)}
+    self.mtimes = mtimes
+    return changed
+
+  def _read(self,timeout:float) -> set:
+    """ Paths changed within timeout, empty when none. """
+    if self.fd is None:
+      time.sleep(min(timeout,self.interval))
+      return self._poll()
+    if not select.select([self.fd],[],[],timeout)[0]: return set()
+    changed = set()
+    try:
+      data = os.read(self.fd,1<<16)
+    except BlockingIOError:
+      return changed
+    i = 0
+    while i < len(data):
+      wd,mask,cookie,size = struct.unpack_from("iIII",data,i)
+      name = data[i+16:i+16+size].rstrip(b"\0").decode(errors="replace")
+      i += 16+size
+      if mask & _IN_Q_OVERFLOW: return set(self.roots) # Lost events, everything may have changed.
+      d = self.wds.get(wd)
+      if d is None: continue
+      path = os.path.join(d,name) if name else d
+      if mask & _IN_ISDIR and mask & (_IN_CREATE|_IN_MOVED_TO) and self._watched(path) and name not in self.prune:
+        self._addtree(path)
+      if self._watched(path): changed.add(path)
+    return changed
+
+  def changes(self,debounce:float=0.3) -> set:
+    """ Wait for a change, then keep collecting until nothing changed for debounce seconds. """
+    changed = set()
+    while not changed:
+      changed = self._read(3600)
+    while True:
+      more = self._read(debounce)
+      if not more: return changed
+      changed |= more
+
+  def drain(self) -> set:
+    """ Changes already pending, without waiting. """
+    return self._read(0) if self.fd is not None else self._poll()
+
+  def close(self) -> None:
+    if self.fd is not None: os.close(self.fd)
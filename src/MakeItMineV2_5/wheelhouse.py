@@ -0,0 +1,152 @@
+import os
+import re
+import json
+import shutil
+import hashlib
+from MakeItMineV2_5.cache import place
+
+
+_SDIST = (".tar.gz",".zip",".tar.bz2")
+
+
+def canonical(name:str) -> str:
+  """ Project name as compared by pip, e.g. Foo_Bar and foo-bar are the same. """
+  return re.sub(r"[-_.]+","-",name).lower()
+
+
+def parse(filename:str) -> tuple:
+  """ (name,version,tags) of a wheel or sdist file name, the tags of an sdist are empty. None when neither. """
+  if filename.endswith(".whl"):
+    parts = filename[:-4].split("-")
+    if len(parts) not in [5,6]: return None
+    py,abi,plat = parts[-3:]
+    return canonical(parts[0]),parts[1],[f"{p}-{a}-{x}" for p in py.split(".") for a in abi.split(".") for x in plat.split(".")]
+  for ext in _SDIST:
+    if filename.endswith(ext) and "-" in filename:
+      name,version = filename[:-len(ext)].rsplit("-",1)
+      return canonical(name),version,[]
+  return None
+
+
+def pins(path:str) -> tuple:
+  """ ([canonical name]=version of the name==version lines, the other requirement lines) of a requirements file. """
+  pinned,other = {},[]
+  with open(path,"r") as f:
+    for line in f:
+      line = line.split(" #")[0].strip()
+      if not line or line.startswith("#"): continue
+      m = re.match(r'^([A-Za-z0-9][A-Za-z0-9._-]*)(\[[^\]]*\])?\s*==\s*([^\s;]+)\s*$',line)
+      if m:
+        pinned[canonical(m.group(1))] = m.group(3)
+      else:
+        other.append(line)
+  return pinned,other
+
+
+class Wheelhouse():
+  """ Content addressed store of wheels and sdists e.g. ~/.make_download.
+      A file is kept once under sha256/ named by its hash and hard linked by its own name into the root,
+      the --find-links layout pip reads. index.json has the name, version, tags and sha256 of every file
+      so whether pinned requirements are all present is answered without running pip's resolver.
+      Files put in the root by other means, e.g. an older pip download, are indexed when found.
+  """
+
+  def __init__(self,root:str):
+    self.root = root
+    self.path = os.path.join(root,"index.json")
+    os.makedirs(root,exist_ok=True)
+    self.index = self._load()
+
+  def _load(self) -> dict:
+    """ The index, updated for the files added, replaced or removed since it was written. """
+    try:
+      with open(self.path,"r") as f:
+        index = json.load(f)
+    except (FileNotFoundError,ValueError):
+      index = {}
+    index.setdefault("files",{})
+    index.setdefault("tags",{})
+    files,changed = {},False
+    for e in os.scandir(self.root):
+      if not e.is_file() or not parse(e.name): continue
+      st = e.stat()
+      entry = index["files"].get(e.name)
+      if entry and entry["stamp"] == [st.st_size,st.st_mtime_ns]:
+        files[e.name] = entry
+      else:
+        files[e.name] = self._store(e.path)
+        changed = True
+    changed |= files.keys() != index["files"].keys()
+    index["files"] = files
+    if changed: self._write(index)
+    return index
+
+  def _write(self,index:dict) -> None:
+    tmp = f"{self.path}.{os.getpid()}"
+    with open(tmp,"w") as f:
+      json.dump(index,f)
+    os.replace(tmp,self.path)
+
+  def _blob(self,sha:str) -> str:
+    return os.path.join(self.root,"sha256",sha[:2],sha)
+
+  def _store(self,path:str) -> dict:
+    """ Move or link path into the store by its sha256 and by its name into the root, returns its index entry. """
+    h = hashlib.sha256()
+    with open(path,"rb") as f:
+      for chunk in iter(lambda: f.read(1<<20),b""):
+        h.update(chunk)
+    sha = h.hexdigest()
+    blob = self._blob(sha)
+    name = os.path.basename(path)
+    dest = os.path.join(self.root,name)
+    if not os.path.exists(blob):
+      os.makedirs(os.path.dirname(blob),exist_ok=True)
+      place(path,blob)
+    if not os.path.exists(dest) or not os.path.samefile(blob,dest):
+      place(blob,dest)
+    if path != dest: os.remove(path)
+    st = os.stat(dest)
+    n,version,tags = parse(name)
+    return {"name":n,"version":version,"tags":tags,"sha256":sha,"stamp":[st.st_size,st.st_mtime_ns]}
+
+  def add(self,paths:list) -> None:
+    """ Store downloaded files, e.g. from a pip download directory. """
+    for path in paths:
+      if parse(os.path.basename(path)):
+        self.index["files"][os.path.basename(path)] = self._store(path)
+    self._write(self.index)
+
+  def tags(self,key:str) -> list:
+    """ Tags an interpreter installs, most specific first, None when not known. key names the interpreter e.g. its path and mtime. """
+    return self.index["tags"].get(key)
+
+  def settags(self,key:str,tags:list) -> None:
+    self.index["tags"][key] = tags
+    self._write(self.index)
+
+  def find(self,name:str,version:str,tags:list) -> str:
+    """ File name of the best file for name==version that installs with tags, a wheel before an sdist. None when there is none. """
+    rank = {t:i for i,t in enumerate(tags)}
+    best = None
+    for filename,entry in self.index["files"].items():
+      if entry["name"] != canonical(name) or entry["version"] != version: continue
+      score = min([rank[t] for t in entry["tags"] if t in rank],default=None) if entry["tags"] else len(rank)
+      if score is not None and (best is None or score < best[0]): best = (score,filename)
+    return best[1] if best else None
+
+  def missing(self,pinned:dict,tags:list) -> dict:
+    """ [name]=version of the pins without a file installing with tags. """
+    return {name:version for name,version in pinned.items() if not self.find(name,version,tags)}
+
+  def link(self,filenames:list,dest:str) -> None:
+    """ Hard link filenames into dest, the other files of dest are removed. """
+    os.makedirs(dest,exist_ok=True)
+    for e in os.scandir(dest):
+      if e.name not in filenames:
+        if e.is_dir(follow_symlinks=False):
+          shutil.rmtree(e.path)
+        else:
+          os.remove(e.path)
+    for filename in filenames:
+      place(os.path.join(self.root,filename),os.path.join(dest,filename))
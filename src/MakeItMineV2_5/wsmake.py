@@ -0,0 +1,119 @@
+import os
+import io
+import shutil
+import argparse
+import contextlib
+from MakeItMineV2_5.make import Make
+
+
+def _wsworker(cls,project:str,command:str) -> tuple:
+  """ Process pool worker: run a command of cls in one project of the workspace.
+      Returns (result, output, error), a failure is reported in error rather than ending the sweep.
+  """
+  out = io.StringIO()
+  try:
+    os.chdir(project)
+    m = cls(cwd=project,isolated=True,interactive=False)
+    with contextlib.redirect_stdout(out):
+      if command == "status":
+        result = m._statusrow()
+      else:
+        result = getattr(m,command)()
+    return result,out.getvalue(),None
+  except (Exception,SystemExit) as e:
+    return None,out.getvalue(),str(e).strip() or type(e).__name__
+
+
+class WsMake(Make):
+  """ Platform independent recipies for a Makefile supporting a workspace of sibling MakeItMine projects.
+      A project is a directory with a BUILD_VERSION.txt, each one is run in its own process.
+  """
+
+  def __init__(self,**kwargs):
+    super().__init__(**kwargs)
+    self.workspace = os.path.dirname(os.path.abspath(self.cwd))
+    self.wsprune = {".git","venv","dist","node_modules","__pycache__"}
+
+  def _wsprojects(self,workspace:str=None,depth:int=3) -> list:
+    """ Paths of the MakeItMine projects under the workspace, a project's own subdirs are not searched. """
+    projects = []
+    todo = [(os.path.abspath(workspace or self.workspace),0)]
+    while todo:
+      d,level = todo.pop()
+      try:
+        entries = list(os.scandir(d))
+      except OSError:
+        continue
+      if [e for e in entries if e.name == self.bv and e.is_file()]:
+        projects.append(d)
+        continue
+      if level < depth:
+        todo += [(e.path,level+1) for e in entries
+                 if e.is_dir(follow_symlinks=False) and e.name not in self.wsprune and not e.name.startswith(".")]
+    return sorted(projects)
+
+  def _wsrun(self,command:str,workspace:str=None,workers:int=None):
+    """ Run command in every project of the workspace on a process pool, yields (project, result, output, error) in project order. """
+    import concurrent.futures
+    projects = self._wsprojects(workspace)
+    if not projects:
+      print(f"No projects (directories with {self.bv}) in {workspace or self.workspace}")
+      return
+    with concurrent.futures.ProcessPoolExecutor(max_workers=min(self._workers(workers),len(projects))) as pool:
+      futures = [pool.submit(_wsworker,type(self),project,command) for project in projects]
+      for project,future in zip(projects,futures):
+        yield (os.path.basename(project),)+future.result()
+
+  def _wsbatch(self,command:str,workspace:str=None,workers:int=None) -> None:
+    """ Run command in every project and print a table of the outcome per project. """
+    from texttable import Texttable
+    table = Texttable(max_width=shutil.get_terminal_size().columns)
+    table.set_cols_align(["l","c","l"])
+    rows = [["project",command,"output"]]
+    for project,result,output,error in self._wsrun(command,workspace,workers):
+      lines = output.strip().split(os.linesep)+([error] if error else [])
+      rows.append([project,"error" if error else "ok",os.linesep.join(lines[-5:])])
+    table.add_rows(rows)
+    print(table.draw())
+
+  def wsstatus(self,workspace:str=None,workers:int=None) -> None:
+    """ Status of every project in the workspace, one row per project. """
+    from texttable import Texttable
+    columns = self._statuscolumns()
+    table = Texttable(max_width=shutil.get_terminal_size().columns)
+    table.set_cols_align(["l"]+[column.align for column in columns])
+    rows = [["project"]+[column.title for column in columns]]
+    for project,result,output,error in self._wsrun("status",workspace,workers):
+      if error:
+        rows.append([f"{project}\nerror: {error}"]+[""]*len(columns))
+        continue
+      warnings,cells = result
+      for warning in warnings:
+        print(f"{project}: {warning}")
+      rows.append([project]+cells)
+    table.add_rows(rows)
+    print(table.draw())
+
+  def wsgtfetch(self,workspace:str=None,workers:int=None) -> None:
+    """ gtfetch in every project of the workspace. """
+    self._wsbatch("gtfetch",workspace,workers)
+
+  def wsgtpush(self,workspace:str=None,workers:int=None) -> None:
+    """ gtpush in every project of the workspace, projects needing an interactive commit are reported. """
+    self._wsbatch("gtpush",workspace,workers)
+
+  def wspybuild(self,workspace:str=None,workers:int=None) -> None:
+    """ pybuild in every project of the workspace. """
+    self._wsbatch("pybuild",workspace,workers)
+
+  @classmethod
+  def _main(cls,ap:argparse.ArgumentParser):
+    """ Add extra parameters. """
+    super()._main(ap)
+    ap.add_argument('-W', '--workspace', help="Workspace directory for ws*, default is the parent of the project")
+    for command in ["wsstatus","wsgtfetch","wsgtpush","wspybuild"]:
+      cls.command_parameters_optional[command] = ["workspace","workers"]
+
+
+if __name__ == "__main__":
+  WsMake.main()
@@ -0,0 +1,30 @@
+import os
+import pytest
+from MakeItMineV2_5.cache import VenvCache
+
+
+def _venv(path:str) -> None:
+  os.makedirs(os.path.join(path,"bin"))
+  with open(os.path.join(path,"pyvenv.cfg"),"w") as f:
+    f.write(f"home = {path}\n")
+
+
+def test_venv_put_get(tmp_path):
+  cache = VenvCache(str(tmp_path/"cache"),1<<30)
+  cache.put("k",_venv)
+  assert cache.meta("k")["seconds"] >= 0
+  assert cache.get("k",str(tmp_path/"venv"))
+  with open(tmp_path/"venv"/"pyvenv.cfg") as f:
+    assert f.read() == f"home = {tmp_path/'venv'}\n"
+
+
+def test_venv_failed_build_is_not_stored(tmp_path):
+  def build(path:str) -> None:
+    _venv(path)
+    raise RuntimeError("pip install failed")
+  cache = VenvCache(str(tmp_path/"cache"),1<<30)
+  with pytest.raises(RuntimeError):
+    cache.put("k",build)
+  assert cache.meta("k") is None
+  assert not cache.get("k",str(tmp_path/"venv"))
+  assert os.listdir(tmp_path/"cache") == []
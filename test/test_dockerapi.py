@@ -0,0 +1,205 @@
+import os
+import json
+import time
+import base64
+import socket
+import threading
+import http.server
+import socketserver
+import pytest
+from MakeItMineV2_5.dockerapi import DockerClient, DockerError, _credentials, _normal, _registry, _split
+
+
+class _Engine(socketserver.ThreadingMixIn,socketserver.UnixStreamServer):
+  """ Fake Docker Engine on a unix socket, routes maps (method,path) to a function of the handler. """
+  daemon_threads = True
+
+  def __init__(self,path:str):
+    super().__init__(path,_Handler)
+    self.routes = {}
+    self.requests = [] # (method,path,headers,body)
+    self.connections = 0
+
+  def handle_error(self,request,client_address) -> None:
+    pass # A client gone mid answer e.g. after its timeout.
+
+
+class _Handler(http.server.BaseHTTPRequestHandler):
+  protocol_version = "HTTP/1.1"
+
+  def setup(self):
+    super().setup()
+    self.server.connections += 1
+
+  def address_string(self) -> str:
+    return "engine"
+
+  def log_message(self,*args) -> None:
+    pass
+
+  def send(self,status:int,body=b"",chunks:list=None,delay:float=0) -> None:
+    """ Answer body, or chunks with chunked transfer encoding and delay seconds before each. """
+    self.send_response(status)
+    if chunks is None:
+      self.send_header("Content-Length",str(len(body)))
+      self.end_headers()
+      self.wfile.write(body)
+      return
+    self.send_header("Transfer-Encoding","chunked")
+    self.end_headers()
+    for chunk in chunks:
+      time.sleep(delay)
+      self.wfile.write(b"%x\r\n%s\r\n"%(len(chunk),chunk))
+      self.wfile.flush()
+    self.wfile.write(b"0\r\n\r\n")
+
+  def _route(self,method:str) -> None:
+    path = self.path.split("?")[0]
+    body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+    self.server.requests.append((method,self.path,dict(self.headers),body))
+    route = self.server.routes.get((method,path))
+    if route:
+      route(self,body)
+    else:
+      self.send(404,b'{"message":"page not found"}')
+
+  def do_GET(self):
+    self._route("GET")
+
+  def do_POST(self):
+    self._route("POST")
+
+  def do_DELETE(self):
+    self._route("DELETE")
+
+
+@pytest.fixture
+def engine(tmp_path):
+  """ (fake engine, client of it) on a socket in a temporary directory. """
+  server = _Engine(str(tmp_path/"engine.sock"))
+  threading.Thread(target=server.serve_forever,args=(0.05,),daemon=True).start()
+  yield server,DockerClient(str(tmp_path/"engine.sock"),timeout=2)
+  server.shutdown()
+  server.server_close()
+
+
+def _lines(*events) -> bytes:
+  return b"".join(json.dumps(e).encode()+b"\n" for e in events)
+
+
+def test_ping_keeps_the_connection(engine):
+  server,client = engine
+  server.routes[("GET","/_ping")] = lambda h,b: h.send(200,b"OK")
+  assert client.ping()
+  assert client.ping()
+  assert server.connections == 1
+
+
+def test_ping_without_engine(tmp_path):
+  with pytest.raises(FileNotFoundError):
+    DockerClient(str(tmp_path/"none.sock")).ping()
+
+
+def test_error_status(engine):
+  server,client = engine
+  server.routes[("GET","/images/json")] = lambda h,b: h.send(500,b'{"message":"engine is down"}')
+  with pytest.raises(DockerError) as e:
+    client.images()
+  assert e.value.status == 500
+  assert "engine is down" in str(e.value)
+  assert client.inspect("missing:1") is None # 404 is not an error for inspect.
+
+
+def test_pull_progress(engine,tmp_path,monkeypatch):
+  server,client = engine
+  monkeypatch.setenv("DOCKER_CONFIG",str(tmp_path))
+  with open(tmp_path/"config.json","w") as f:
+    json.dump({"auths":{"https://registry.example.com":{"auth":base64.b64encode(b"me:secret").decode()}}},f)
+  stream = _lines({"status":"Pulling from app","id":"1.0"},
+                  {"status":"Downloading","id":"l1","progressDetail":{"current":1,"total":2}},
+                  {"status":"Download complete","id":"l1"},
+                  {"status":"Status: Downloaded newer image for registry.example.com/app:1.0"})
+  chunks = [stream[i:i+17] for i in range(0,len(stream),17)] # Events split across chunks.
+  server.routes[("POST","/images/create")] = lambda h,b: h.send(200,chunks=chunks)
+  events = []
+  last = client.pull("registry.example.com/app:1.0",events.append)
+  assert [e["status"] for e in events][:2] == ["Pulling from app","Downloading"]
+  assert last["status"].startswith("Status: Downloaded")
+  method,path,headers,_ = server.requests[-1]
+  assert path == "/images/create?fromImage=registry.example.com%2Fapp&tag=1.0"
+  auth = json.loads(base64.urlsafe_b64decode(headers["X-Registry-Auth"]))
+  assert auth == {"username":"me","password":"secret","serveraddress":"registry.example.com"}
+
+
+def test_pull_error_in_stream(engine):
+  server,client = engine
+  server.routes[("POST","/images/create")] = lambda h,b: h.send(200,chunks=[_lines({"status":"Pulling"},{"error":"manifest unknown"})])
+  with pytest.raises(DockerError,match="manifest unknown"):
+    client.pull("app:1.0")
+
+
+def test_pull_waits_longer_than_the_timeout(engine):
+  server,client = engine
+  client.timeout = 0.3
+  server.routes[("POST","/images/create")] = lambda h,b: h.send(200,chunks=[_lines({"status":"Extracting"}),_lines({"status":"Done"})],delay=0.5)
+  assert client.pull("app:1.0")["status"] == "Done"
+  server.routes[("GET","/_ping")] = lambda h,b: (time.sleep(0.5),h.send(200,b"OK"))
+  with pytest.raises(socket.timeout):
+    client.ping()
+  server.routes[("GET","/_ping")] = lambda h,b: h.send(200,b"OK")
+  assert client.ping() # On a new connection.
+
+
+def test_save_load(engine,tmp_path):
+  server,client = engine
+  tar = os.urandom(3<<20)
+  loaded = []
+  server.routes[("GET","/images/get")] = lambda h,b: h.send(200,chunks=[tar[i:i+(1<<20)] for i in range(0,len(tar),1<<20)])
+  server.routes[("POST","/images/load")] = lambda h,b: (loaded.append(b),h.send(200,chunks=[_lines({"stream":"Loaded image: app:1.0\n"})]))
+  path = str(tmp_path/"app.tar")
+  client.save("app:1.0",path)
+  with open(path,"rb") as f:
+    assert f.read() == tar
+  client.load(path)
+  assert loaded == [tar]
+
+
+def test_load_stream_error(engine,tmp_path):
+  server,client = engine
+  server.routes[("POST","/images/load")] = lambda h,b: h.send(200,chunks=[_lines({"stream":"Loading layer"},{"error":"invalid tar header"})])
+  path = tmp_path/"bad.tar"
+  path.write_bytes(b"not a tar")
+  with pytest.raises(DockerError,match="invalid tar header"):
+    client.load(str(path))
+
+
+def test_stop_and_remove_missing_container(engine):
+  server,client = engine
+  assert client.stop("gone") is False
+  assert client.remove("gone") is False
+
+
+def test_references():
+  assert _split("app:1.0") == ("app","1.0")
+  assert _split("localhost:5000/app") == ("localhost:5000/app","latest")
+  assert _split("app@sha256:abc") == ("app@sha256:abc",None)
+  assert _registry("python:3.11") == "docker.io"
+  assert _registry("library/python") == "docker.io"
+  assert _registry("localhost:5000/app") == "localhost:5000"
+  assert _registry("ghcr.io/org/app:1") == "ghcr.io"
+  assert _normal("redis") == "redis:latest"
+  assert _normal("docker.io/library/redis:7") == "redis:7"
+  assert _normal("docker.io/org/app") == "org/app:latest"
+  assert _normal("localhost:5000/app") == "localhost:5000/app:latest"
+  assert _normal("redis@sha256:abc") == "redis@sha256:abc"
+
+
+def test_credentials(tmp_path):
+  config = str(tmp_path/"config.json")
+  assert _credentials("ghcr.io",config) is None
+  with open(config,"w") as f:
+    json.dump({"auths":{"https://index.docker.io/v1/":{"auth":base64.b64encode(b"hub:pw").decode()},
+                        "ghcr.io":{"identitytoken":"tok"}}},f)
+  assert _credentials("docker.io",config) == {"username":"hub","password":"pw","serveraddress":"https://index.docker.io/v1/"}
+  assert _credentials("ghcr.io",config) == {"identitytoken":"tok","serveraddress":"ghcr.io"}
+  assert _credentials("quay.io",config) is None
@@ -0,0 +1,51 @@
+import os
+import subprocess
+import pytest
+from MakeItMineV2_5.gtmake import GtMake
+
+
+@pytest.fixture
+def repo(tmp_path,monkeypatch):
+  """ A repository with its own HOME and XDG_CONFIG_HOME and no system config. """
+  monkeypatch.setenv("HOME",str(tmp_path/"home"))
+  monkeypatch.setenv("XDG_CONFIG_HOME",str(tmp_path/"xdg"))
+  monkeypatch.setenv("GIT_CONFIG_NOSYSTEM","1")
+  os.makedirs(tmp_path/"home")
+  os.makedirs(tmp_path/"xdg"/"git")
+  subprocess.run(["git","init","-q",str(tmp_path/"repo")],check=True)
+  return tmp_path
+
+
+def _git(*args) -> None:
+  subprocess.run(["git"]+list(args),check=True)
+
+
+def _config(repo,key:str) -> tuple:
+  """ (in process values,git's values) of key. """
+  cli = subprocess.run(["git","-C",str(repo/"repo"),"config","--get-all",key],capture_output=True,text=True).stdout.split()
+  return GtMake(cwd=str(repo/"repo"))._gtrefs().config(key),cli
+
+
+def test_global_config(repo):
+  _git("config","--file",str(repo/"home"/".gitconfig"),"core.untrackedCache","true")
+  refs = GtMake(cwd=str(repo/"repo"))._gtrefs()
+  assert not refs.cli
+  assert _config(repo,"core.untrackedCache") == (["true"],["true"])
+
+
+def test_config_order(repo):
+  _git("config","--file",str(repo/"xdg"/"git"/"config"),"--add","remote.x.fetch","xdg")
+  _git("config","--file",str(repo/"home"/".gitconfig"),"--add","remote.x.fetch","home")
+  _git("-C",str(repo/"repo"),"config","--add","remote.x.fetch","repo")
+  assert _config(repo,"remote.x.fetch") == (["xdg","home","repo"],["xdg","home","repo"])
+  _git("config","--file",str(repo/"home"/".gitconfig"),"core.untrackedCache","true")
+  _git("-C",str(repo/"repo"),"config","core.untrackedCache","false")
+  assert _config(repo,"core.untrackedCache")[0][-1] == "false" # The repository wins.
+
+
+def test_global_include_uses_git(repo):
+  _git("config","--file",str(repo/"home"/".gitconfig"),"include.path",str(repo/"more"))
+  _git("config","--file",str(repo/"more"),"core.untrackedCache","true")
+  refs = GtMake(cwd=str(repo/"repo"))._gtrefs()
+  assert refs.cli
+  assert refs.config("core.untrackedCache") == ["true"]
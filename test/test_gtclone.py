@@ -0,0 +1,66 @@
+import os
+import subprocess
+import pytest
+from MakeItMineV2_5.gtmake import GtMake
+
+
+def _git(cwd,*args) -> str:
+  return subprocess.run(["git","-C",str(cwd)]+list(args),check=True,capture_output=True,text=True).stdout.strip()
+
+
+def _commit(cwd,files:dict,message:str) -> None:
+  for name,text in files.items():
+    os.makedirs(os.path.dirname(os.path.join(cwd,name)) or cwd,exist_ok=True)
+    with open(os.path.join(cwd,name),"w") as f:
+      f.write(text)
+  _git(cwd,"add","-A")
+  _git(cwd,"commit","-q","-m",message)
+
+
+@pytest.fixture
+def origin(tmp_path,monkeypatch):
+  """ A bare origin allowing partial clones: main with 6 commits after a feature branch forked off with 3 commits. """
+  for name in ["GIT_AUTHOR_NAME","GIT_COMMITTER_NAME"]: monkeypatch.setenv(name,"mim")
+  for name in ["GIT_AUTHOR_EMAIL","GIT_COMMITTER_EMAIL"]: monkeypatch.setenv(name,"mim@example.com")
+  monkeypatch.delenv("MIM_OFFLINE",raising=False)
+  _git(tmp_path,"init","-q","--bare","--initial-branch","main","origin")
+  _git(tmp_path/"origin","config","uploadpack.allowFilter","true")
+  work = tmp_path/"work"
+  _git(tmp_path,"clone","-q",str(tmp_path/"origin"),"work")
+  _commit(work,{"pyproject.toml":'[project]\nname = "app"\n\n[tool.makeitmine.git]\nsparse = ["src"]\n',
+                "src/app.py":"","docs/index.md":""},"first")
+  _git(work,"switch","-q","-c","feature")
+  for i in range(3):
+    _commit(work,{f"src/feature{i%2}.py":str(i)},f"feature {i}")
+  _git(work,"switch","-q","main")
+  for i in range(6):
+    _commit(work,{"docs/index.md":str(i)},f"main {i}")
+  _git(work,"push","-q","origin","main","feature")
+  os.makedirs(tmp_path/"clones")
+  monkeypatch.chdir(tmp_path/"clones")
+  return tmp_path
+
+
+def test_gtclone_shallow_sparse(origin):
+  GtMake(cwd=str(origin/"clones")).gtclone(f"file://{origin/'origin'}",depth=1)
+  clone = origin/"clones"/"origin"
+  assert _git(clone,"config","remote.origin.promisor") == "true"
+  assert _git(clone,"config","remote.origin.partialclonefilter") == "blob:none"
+  assert os.path.exists(clone/".git"/"shallow")
+  assert _git(clone,"sparse-checkout","list") == "src"
+  assert sorted(os.listdir(clone)) == [".git","pyproject.toml","src"]
+  assert _git(clone,"rev-list","--count","origin/feature") == "1"
+
+
+def test_gtmainbehind_deepens(origin,capsys,monkeypatch):
+  GtMake(cwd=str(origin/"clones")).gtclone(f"file://{origin/'origin'}",depth=1)
+  clone = origin/"clones"/"origin"
+  _git(clone,"switch","-q","feature")
+  monkeypatch.chdir(clone)
+  make = GtMake(cwd=str(clone))
+  assert make.gtmainbehind(show=False).startswith("2/files\nfeature/br\n")
+  assert _git(clone,"merge-base","origin/main","origin/feature") != ""
+  capsys.readouterr()
+  make.gtmainbehindfiles(show=False)
+  assert capsys.readouterr().out.split() == ["src/feature0.py","src/feature1.py"]
+  assert make.gtmainahead(show=False).startswith("1/files\nfeature/br\n")
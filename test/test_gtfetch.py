@@ -0,0 +1,89 @@
+import os
+import sys
+import time
+import subprocess
+import pytest
+from MakeItMineV2_5.gtmake import GtMake
+
+
+def _git(cwd,*args) -> str:
+  return subprocess.run(["git","-C",str(cwd)]+list(args),check=True,capture_output=True,text=True).stdout.strip()
+
+
+@pytest.fixture
+def clone(tmp_path,monkeypatch):
+  """ A clone of a bare origin, fetched once, and a second clone that pushes to the origin. """
+  for name in ["GIT_AUTHOR_NAME","GIT_COMMITTER_NAME"]: monkeypatch.setenv(name,"mim")
+  for name in ["GIT_AUTHOR_EMAIL","GIT_COMMITTER_EMAIL"]: monkeypatch.setenv(name,"mim@example.com")
+  for name in ["MIM_OFFLINE","MIM_FETCH_TTL","MIM_FETCH_BACKGROUND"]: monkeypatch.delenv(name,raising=False)
+  _git(tmp_path,"init","-q","--bare","--initial-branch","main","origin")
+  _git(tmp_path,"clone","-q",str(tmp_path/"origin"),"other")
+  _git(tmp_path/"other","commit","-q","--allow-empty","-m","first")
+  _git(tmp_path/"other","push","-q","origin","main")
+  _git(tmp_path,"clone","-q",str(tmp_path/"origin"),"clone")
+  _git(tmp_path/"clone","fetch","-q")
+  monkeypatch.chdir(tmp_path/"clone") # git runs in the current directory like in a make.
+  return tmp_path
+
+
+def _push(tmp_path) -> str:
+  """ A new commit on the origin's main. """
+  _git(tmp_path/"other","commit","-q","--allow-empty","-m","next")
+  _git(tmp_path/"other","push","-q","origin","main")
+  return _git(tmp_path/"other","rev-parse","HEAD")
+
+
+def _age(tmp_path,seconds:int) -> None:
+  """ Make the last fetch seconds old. """
+  t = time.time()-seconds
+  os.utime(tmp_path/"clone"/".git"/"FETCH_HEAD",(t,t))
+
+
+def test_fetch_ttl(clone,monkeypatch):
+  head = _push(clone)
+  monkeypatch.setenv("MIM_FETCH_TTL","600")
+  _age(clone,60)
+  assert GtMake(cwd=str(clone/"clone"))._gtfetch() == "fresh"
+  assert _git(clone/"clone","rev-parse","origin/main") != head
+  _age(clone,900)
+  assert GtMake(cwd=str(clone/"clone"))._gtfetch() == "fetched"
+  assert _git(clone/"clone","rev-parse","origin/main") == head
+  _push(clone)
+  assert GtMake(cwd=str(clone/"clone"))._gtfetch(force=True) == "fetched"
+
+
+def test_offline(clone,monkeypatch):
+  head = _push(clone)
+  _age(clone,900)
+  monkeypatch.setenv("MIM_OFFLINE","1")
+  assert GtMake(cwd=str(clone/"clone"))._gtfetch(force=True) == "offline"
+  monkeypatch.delenv("MIM_OFFLINE")
+  env = dict(os.environ,PYTHONPATH=os.pathsep.join(sys.path))
+  out = subprocess.run([sys.executable,"-m","MakeItMineV2_5.gtmake","gtfetch","--offline"],cwd=clone/"clone",env=env,capture_output=True,text=True).stdout
+  assert "offline, not fetching" in out
+  assert _git(clone/"clone","rev-parse","origin/main") != head
+
+
+def test_fetch_background(clone,monkeypatch):
+  head = _push(clone)
+  _age(clone,900)
+  monkeypatch.setenv("MIM_FETCH_BACKGROUND","1")
+  assert GtMake(cwd=str(clone/"clone"))._gtfetch() == "background"
+  deadline = time.time()+10
+  while _git(clone/"clone","rev-parse","origin/main") != head and time.time() < deadline:
+    time.sleep(0.05)
+  assert _git(clone/"clone","rev-parse","origin/main") == head
+
+
+def test_remoteage_cell(clone,monkeypatch):
+  monkeypatch.setenv("MIM_FETCH_TTL","7200")
+  _age(clone,3900)
+  assert GtMake(cwd=str(clone/"clone"))._gtremoteagecell() == "00d:01H:05M/fetched"
+  monkeypatch.setenv("MIM_OFFLINE","1")
+  assert GtMake(cwd=str(clone/"clone"))._gtremoteagecell() == "00d:01H:05M/fetched\noffline"
+  os.remove(clone/"clone"/".git"/"FETCH_HEAD")
+  assert GtMake(cwd=str(clone/"clone"))._gtremoteagecell() == "never/fetched\noffline"
+  monkeypatch.delenv("MIM_OFFLINE")
+  monkeypatch.setenv("MIM_FETCH_BACKGROUND","1")
+  # The detached fetch may rewrite FETCH_HEAD before the age is read.
+  assert GtMake(cwd=str(clone/"clone"))._gtremoteagecell().endswith("/fetched\nfetching")